@@ -7,31 +7,179 @@ from textual.widgets import Header, Footer, Static, Input, Button, DataTable, Se
 from textual.containers import Container, Horizontal, ScrollableContainer
 from textual.screen import ModalScreen
 from textual.binding import Binding
+from textual.message import Message
 from network import *
-import subprocess
+from theme import CONFIG_DIR, ThemeLoader
+from daemon import DaemonFeed
 import asyncio
 import json
-from pathlib import Path
-try:
-    import tomllib  # Python 3.11+
-except ImportError:
-    try:
-        import tomli as tomllib  # Fallback for older Python
-    except ImportError:
-        tomllib = None  # Will use fallback colors
-
-def normalize_color_format(color):
-    """Convert 0xRRGGBB to #RRGGBB for CSS/Textual compatibility.
-    
+import time
+from functools import partial
+
+class NetworkOpDone(Message):
+    """Posted from a worker thread when a network operation has finished"""
+
+    bubble = False
+
+    def __init__(self, text) -> None:
+        super().__init__()
+        self.text = text
+
+class NetworkChanged(Message):
+    """Posted from the NetworkMonitor thread for each NetworkManager event"""
+
+    bubble = False
+
+    def __init__(self, event) -> None:
+        super().__init__()
+        self.event = event
+
+class ScanFinished(Message):
+    """Posted by the ScanEngine thread once scan results are published"""
+
+    bubble = False
+
+    def __init__(self, fresh) -> None:
+        super().__init__()
+        self.fresh = fresh
+
+class NetworkWorkerMixin:
+    """Run blocking network.py calls in worker threads
+
+    The result comes back as a NetworkOpDone message, so the event loop
+    keeps handling keys and repainting while NetworkManager is busy.
+    """
+
+    def run_network_op(self, progress, done, func, *args) -> None:
+        """Notify progress, then run func(*args) off the event loop
+
+        Args:
+            progress: Toast shown immediately, or None
+            done: Maps the result of func to the completion toast, or None
+            func: Blocking network.py function
+        """
+        if progress:
+            self.notify(progress)
+        self.run_worker(partial(self._network_op, done, func, args),
+                        thread=True, group="network", exit_on_error=False)
+
+    def _network_op(self, done, func, args) -> None:
+        try:
+            result = func(*args)
+            text = done(result) if done else None
+        except Exception as e:
+            log.exception("%s failed", getattr(func, '__name__', func))
+            text = f"✗ {e}"
+        self.post_message(NetworkOpDone(text))
+
+def connected_text(result):
+    """Completion toast for (ok, msg) results"""
+    ok, msg = result
+    return "✓ Connected" if ok else f"✗ {msg}"
+
+def add_keyed_columns(table, *labels) -> None:
+    """Add columns keyed by their lower-cased label"""
+    for label in labels:
+        table.add_column(label, key=label.lower())
+
+def sync_table(table, rows, key_column="name", keys=None) -> None:
+    """Reconcile a DataTable with rows without clearing it
+
+    Only cells whose value changed are updated, rows that vanished are
+    removed and new rows are added, so layout work scales with the change
+    and the cursor stays on the same row key.
+
     Args:
-        color: Color string in any format
-    
-    Returns:
-        Color string in CSS format (#RRGGBB)
+        table: DataTable with keyed columns, rows keyed by key_column's value
+        rows: Cell tuples in display order
+        key_column: Column whose value identifies the row
+        keys: Row keys in the order of rows, for tables whose cells can repeat
     """
-    if isinstance(color, str) and color.startswith('0x'):
-        return '#' + color[2:]
-    return color
+    columns = list(table.columns)
+    if keys is None:
+        key_index = columns.index(key_column)
+        wanted = {str(cells[key_index]): cells for cells in rows}
+    else:
+        wanted = dict(zip(keys, rows))
+
+    cursor_key = None
+    if 0 <= table.cursor_row < table.row_count:
+        cursor_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
+
+    for row_key in list(table.rows):
+        if row_key.value not in wanted:
+            table.remove_row(row_key)
+    for key, cells in wanted.items():
+        if key in table.rows:
+            for column, value in zip(columns, cells):
+                if table.get_cell(key, column) != value:
+                    table.update_cell(key, column, value)
+        else:
+            table.add_row(*cells, key=key)
+
+    order = list(wanted)
+    if [row.key.value for row in table.ordered_rows] != order:
+        if keys is None:
+            rank = {key: i for i, key in enumerate(order)}
+            table.sort(key_column, key=lambda value: rank[str(value)])
+        else:  # sort() only sees cell values, which may repeat; re-add in order
+            for key in order:
+                table.remove_row(key)
+                table.add_row(*wanted[key], key=key)
+    if cursor_key in wanted:
+        table.move_cursor(row=table.get_row_index(cursor_key))
+
+def channel_text(ap):
+    """Channel and band of an access point, e.g. '36 (5G)'"""
+    if not ap.channel:
+        return "-"
+    return f"{ap.channel} ({band_label(ap.frequency)})"
+
+def bssid_key(ap):
+    """Row key and Name cell of a BSSID row under its expanded SSID"""
+    return f"  {ap.bssid}"
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+SPARK_WIDTH = 12  # Newest signal samples shown in the Trend column
+
+def sparkline(samples, width=SPARK_WIDTH):
+    """Signal percentages as a row of block characters, newest on the right"""
+    return "".join(SPARK_BLOCKS[min(s * len(SPARK_BLOCKS) // 101, len(SPARK_BLOCKS) - 1)]
+                   for s in samples[-width:])
+
+def age_text(seconds):
+    """Compact age such as '40s', '5m' or '2d'"""
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{int(seconds // size)}{unit}"
+    return f"{max(int(seconds), 0)}s"
+
+def rate_text(ap):
+    return f"{ap.rate} Mb/s" if ap.rate else "-"
+
+def throughput_text(rate):
+    """Bytes per second as e.g. '1.2 MB/s', or '-' when not measured yet"""
+    if rate is None:
+        return "-"
+    if rate < 1000:
+        return f"{rate:.0f} B/s"
+    for unit in ("kB/s", "MB/s", "GB/s"):
+        rate /= 1000
+        if rate < 1000:
+            break
+    return f"{rate:.1f} {unit}"
+
+LINK_COLUMNS = ("link", "rx", "tx", "err/drop")
+
+def link_cells(info):
+    """Link, RX, TX and Err/Drop cells of a Device row from a LinkMeter sample"""
+    if info is None:
+        return ("-", "-", "-", "-")
+    state = info['operstate']
+    if state == "unknown":  # Common for modems and tunnels; carrier still says something
+        state = "up" if info['carrier'] else "down"
+    return (state, throughput_text(info['rx_rate']), throughput_text(info['tx_rate']),
+            f"{info['rx_errors'] + info['tx_errors']}/{info['rx_dropped'] + info['tx_dropped']}")
 
 class HiddenNetworkScreen(ModalScreen):
     """Modal for connecting to hidden SSID"""
@@ -73,7 +221,7 @@ class HiddenNetworkScreen(ModalScreen):
         """Handle Esc key"""
         self.app.pop_screen()
 
-class VPNScreen(ModalScreen):
+class VPNScreen(NetworkWorkerMixin, ModalScreen):
     """Screen for VPN connection management"""
 
     BINDINGS = [
@@ -95,17 +243,24 @@ class VPNScreen(ModalScreen):
     def on_mount(self) -> None:
         """Initialize VPN table"""
         table = self.query_one("#vpn-table", DataTable)
-        table.add_columns("Status", "Name")
+        add_keyed_columns(table, "Status", "Name")
         self.refresh_vpn_list()
         table.focus()
 
     def refresh_vpn_list(self) -> None:
         """Refresh VPN connection list"""
-        table = self.query_one("#vpn-table", DataTable)
-        table.clear()
-        for vpn in get_vpn_list():
-            status = "🟢" if vpn['active'] else "⚪"
-            table.add_row(status, vpn['name'])
+        self.run_worker(self._load_vpn_list, thread=True, exclusive=True, group="refresh")
+
+    def _load_vpn_list(self) -> None:
+        """Fetch VPN list in a worker thread"""
+        vpns = get_vpn_list()
+        self.app.call_from_thread(self._render_vpn_list, vpns)
+
+    def _render_vpn_list(self, vpns) -> None:
+        # Keyed by UUID: profiles may share a name
+        rows = [("🟢" if vpn.active else "⚪", vpn.name) for vpn in vpns]
+        sync_table(self.query_one("#vpn-table", DataTable), rows,
+                   keys=[vpn.uuid or vpn.name for vpn in vpns])
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         """Handle row selection (Enter key)"""
@@ -116,20 +271,23 @@ class VPNScreen(ModalScreen):
         table = self.query_one("#vpn-table", DataTable)
         if table.cursor_row >= 0 and table.cursor_row < table.row_count:
             row = table.get_row_at(table.cursor_row)
-            status, name = str(row[0]), str(row[1])
+            status = str(row[0])
+            uuid = table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
 
             if status == "🟢":
-                # Disconnect
-                self.notify("Disconnecting...")
-                success = disconnect_vpn(name)
-                self.notify("✓ Disconnected" if success else "✗ Failed")
+                self.run_network_op("Disconnecting...",
+                                    lambda ok: "✓ Disconnected" if ok else "✗ Failed",
+                                    disconnect_vpn, uuid)
             else:
-                # Connect
-                self.notify("Connecting...")
-                success, msg = connect_vpn(name)
-                self.notify("✓ Connected" if success else "✗ Failed")
-
-            self.refresh_vpn_list()
+                self.run_network_op("Connecting...",
+                                    lambda r: "✓ Connected" if r[0] else "✗ Failed",
+                                    connect_vpn, uuid)
+
+    def on_network_op_done(self, message: NetworkOpDone) -> None:
+        """Report the result and reload the list"""
+        if message.text:
+            self.notify(message.text)
+        self.refresh_vpn_list()
 
     def action_cursor_down(self) -> None:
         """Move cursor down"""
@@ -152,7 +310,7 @@ class VPNScreen(ModalScreen):
         """Return to main screen on Escape"""
         self.app.pop_screen()
 
-class WWANScreen(ModalScreen):
+class WWANScreen(NetworkWorkerMixin, ModalScreen):
     """Screen for WWAN (cellular) connection management"""
 
     BINDINGS = [
@@ -174,28 +332,34 @@ class WWANScreen(ModalScreen):
     def on_mount(self) -> None:
         """Initialize WWAN table"""
         table = self.query_one("#wwan-table", DataTable)
-        table.add_columns("Status", "Name", "Signal", "Operator", "Tech")
+        add_keyed_columns(table, "Status", "Name", "Signal", "Operator", "Tech")
         self.refresh_wwan_list()
         table.focus()
 
     def refresh_wwan_list(self) -> None:
         """Refresh WWAN connection list"""
-        table = self.query_one("#wwan-table", DataTable)
-        table.clear()
+        self.run_worker(self._load_wwan_list, thread=True, exclusive=True, group="refresh")
+
+    def _load_wwan_list(self) -> None:
+        """Fetch WWAN list in a worker thread"""
         wwans = get_wwan_list()
+        self.app.call_from_thread(self._render_wwan_list, wwans)
 
+    def _render_wwan_list(self, wwans) -> None:
+        # Keyed by UUID: profiles may share a name
+        keys = [wwan.get('uuid') or wwan['name'] for wwan in wwans]
         if not wwans:
-            table.add_row("⚪", "No WWAN connections found", "-", "-", "-")
+            rows = [("⚪", "No WWAN connections found", "-", "-", "-")]
+            keys = [""]
         else:
-            for wwan in wwans:
-                status = "🟢" if wwan['active'] else "⚪"
-                table.add_row(
-                    status,
-                    wwan['name'],
-                    wwan.get('signal', '-'),
-                    wwan.get('operator', '-'),
-                    wwan.get('tech', '-')
-                )
+            rows = [(
+                "🟢" if wwan['active'] else "⚪",
+                wwan['name'],
+                wwan.get('signal', '-'),
+                wwan.get('operator', '-'),
+                wwan.get('tech', '-')
+            ) for wwan in wwans]
+        sync_table(self.query_one("#wwan-table", DataTable), rows, keys=keys)
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         """Handle row selection (Enter key)"""
@@ -206,24 +370,27 @@ class WWANScreen(ModalScreen):
         table = self.query_one("#wwan-table", DataTable)
         if table.cursor_row >= 0 and table.cursor_row < table.row_count:
             row = table.get_row_at(table.cursor_row)
-            status, name = str(row[0]), str(row[1])
+            status = str(row[0])
+            uuid = table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
 
             # Don't try to connect if no connections found
-            if name == "No WWAN connections found":
+            if not uuid:
                 return
 
             if status == "🟢":
-                # Disconnect
-                self.notify("Disconnecting...")
-                success = disconnect_wwan(name)
-                self.notify("✓ Disconnected" if success else "✗ Failed")
+                self.run_network_op("Disconnecting...",
+                                    lambda ok: "✓ Disconnected" if ok else "✗ Failed",
+                                    disconnect_wwan, uuid)
             else:
-                # Connect
-                self.notify("Connecting...")
-                success, msg = connect_wwan(name)
-                self.notify("✓ Connected" if success else "✗ Failed")
-
-            self.refresh_wwan_list()
+                self.run_network_op("Connecting...",
+                                    lambda r: "✓ Connected" if r[0] else "✗ Failed",
+                                    connect_wwan, uuid)
+
+    def on_network_op_done(self, message: NetworkOpDone) -> None:
+        """Report the result and reload the list"""
+        if message.text:
+            self.notify(message.text)
+        self.refresh_wwan_list()
 
     def action_cursor_down(self) -> None:
         """Move cursor down"""
@@ -246,6 +413,48 @@ class WWANScreen(ModalScreen):
         """Return to main screen on Escape"""
         self.app.pop_screen()
 
+def phases_text(entry):
+    """Where a connection attempt spent its time, e.g. 'config 1.2s  ip-config 3.0s'"""
+    return "  ".join(f"{p['state']} {p['duration']:.1f}s"
+                     for p in entry['phases'] if p['duration'] >= 0.05)
+
+class ConnectTimesScreen(ModalScreen):
+    """Screen showing how long recent connection attempts spent in each state"""
+
+    BINDINGS = [
+        ("escape", "cancel", "Back"),
+        Binding("j", "cursor_down", show=False),
+        Binding("k", "cursor_up", show=False),
+        Binding("q", "cancel", "Back"),
+    ]
+
+    def compose(self) -> ComposeResult:
+        yield Container(
+            Static("Connection Times", classes="section-title"),
+            DataTable(id="times-table", cursor_type="row"),
+            classes="section"
+        )
+
+    def on_mount(self) -> None:
+        """Fill the table from the connect log, newest first"""
+        table = self.query_one("#times-table", DataTable)
+        add_keyed_columns(table, "When", "Network", "Result", "Total", "Phases")
+        for entry in reversed(load_connect_log()):
+            table.add_row(time.strftime("%m-%d %H:%M:%S", time.localtime(entry['started'])),
+                          entry['name'], "ok" if entry['ok'] else "failed",
+                          f"{entry['total']:.1f}s", phases_text(entry))
+        table.focus()
+
+    def action_cursor_down(self) -> None:
+        self.query_one("#times-table", DataTable).action_cursor_down()
+
+    def action_cursor_up(self) -> None:
+        self.query_one("#times-table", DataTable).action_cursor_up()
+
+    def action_cancel(self) -> None:
+        """Return to main screen on Escape"""
+        self.app.pop_screen()
+
 class Wired8021xScreen(ModalScreen):
     """Modal for connecting to wired 802.1X network"""
 
@@ -358,294 +567,25 @@ class PasswordScreen(ModalScreen):
         """Handle Esc key"""
         self.app.pop_screen()
 
-def load_omarchy_colors():
-    """
-    Load colors from Omarchy's active theme.
-    Returns dict with RGB color values, or None if not found.
-    """
-    if tomllib is None:
-        return None
-    
-    theme_file = Path.home() / ".config/omarchy/current/theme/alacritty.toml"
-    
-    if not theme_file.exists():
-        return None
-    
-    try:
-        with open(theme_file, "rb") as f:
-            data = tomllib.load(f)
-        
-        colors = data.get("colors", {})
-        normal = colors.get("normal", {})
-        bright = colors.get("bright", {})
-        primary = colors.get("primary", {})
-        
-        return {
-            "accent": normalize_color_format(normal.get("yellow") or bright.get("yellow") or "#EBCB8B"),
-            "primary": normalize_color_format(normal.get("red") or bright.get("red") or "#BF616A"),
-            "foreground": normalize_color_format(primary.get("foreground") or "#D8DEE9"),
-            "background": normalize_color_format(primary.get("background") or "#2E3440"),
-        }
-    except Exception:
-        # If parsing fails, return None to use fallback
-        return None
-
-def load_omarchy_styles():
-    """
-    Detect border style preferences from Omarchy's Hyprland config.
-    Checks all Hyprland config sources in cascade order (last value wins):
-      1. ~/.local/share/omarchy/default/hypr/looknfeel.conf (system default)
-      2. ~/.config/omarchy/current/theme/hyprland.conf (theme override)
-      3. ~/.config/hypr/looknfeel.conf (user override)
-    Returns dict with border style overrides, or None if not found.
-    """
-    # Check if this is an Omarchy system
-    omarchy_indicator = Path.home() / ".config/omarchy/current/theme/alacritty.toml"
-    if not omarchy_indicator.exists():
-        return None
-
-    # Hyprland sources in cascade order — last uncommented value wins
-    config_files = [
-        Path.home() / ".local/share/omarchy/default/hypr/looknfeel.conf",
-        Path.home() / ".config/omarchy/current/theme/hyprland.conf",
-        Path.home() / ".config/hypr/looknfeel.conf",
-    ]
-
-    rounding = 0  # Default: no rounding
-    border_size = 2  # Omarchy default
-
-    try:
-        for config_file in config_files:
-            if not config_file.exists():
-                continue
-            with open(config_file, "r") as f:
-                for line in f:
-                    stripped = line.strip()
-                    # Skip comments
-                    if stripped.startswith("#"):
-                        continue
-                    if "=" in stripped:
-                        key, _, val = stripped.partition("=")
-                        key_name = key.strip()
-                        if key_name == "rounding":
-                            rounding = int(val.strip())
-                        elif key_name == "border_size":
-                            border_size = int(val.strip())
-    except Exception:
-        return None
-
-    # Rounding takes priority — use rounded borders
-    if rounding > 0:
-        return {
-            "dialog_border": "round",
-            "section_border": "round",
-        }
-
-    # Map Hyprland border_size to closest Textual border style
-    if border_size == 0:
-        border_style = "blank"
-    elif border_size >= 3:
-        border_style = "heavy"
-    else:
-        border_style = "solid"
-
-    return {
-        "dialog_border": border_style,
-        "section_border": border_style,
-    }
-
-def load_user_colors(config_dir: Path):
-    """
-    Load colors from user defined theme file.
-    Returns dict with RGB color values, or None if not found.
-    Create file if it doesnt exist, dont load after creation.
-    """
-    if tomllib is None or try_create_user_theme_template(config_dir):
-        return None
-    theme_file = config_dir / "theme.toml"
-
-    if not theme_file.exists():
-        return None
-
-    try:
-        with open(theme_file, "rb") as f:
-            data = tomllib.load(f)
-
-        colors = data.get("colors", {})
-        normal = colors.get("normal", {})
-        bright = colors.get("bright", {})
-        primary = colors.get("primary", {})
-
-        return {
-            "accent": normalize_color_format(normal.get("yellow") or bright.get("yellow") or "#EBCB8B"),
-            "primary": normalize_color_format(normal.get("red") or bright.get("red") or "#BF616A"),
-            "foreground": normalize_color_format(primary.get("foreground") or "#D8DEE9"),
-            "background": normalize_color_format(primary.get("background") or "#2E3440"),
-        }
-    except Exception:
-        # If parsing fails, return None to use fallback
-        return None
-
-# Default style values matching the original hardcoded CSS
-DEFAULT_STYLES = {
-    "dialog_border": "solid",
-    "dialog_width": "60",
-    "dialog_padding": "1 2",
-    "section_border": "solid",
-    "section_margin": "1 2",
-    "section_padding": "0 1",
-    "section_title_padding": "0 1",
-    "info_section_height": "5",
-    "input_height": "3",
-    "button_min_width": "12",
-    "cursor_opacity": "30%",
-    "hover_opacity": "20%",
-    "title_text_style": "bold",
-    "section_title_text_style": "bold",
-}
-
-# Valid Textual border styles for validation
-VALID_BORDER_STYLES = {"none", "ascii", "blank", "dashed", "double", "heavy", "hidden", "hkey", "inner", "outer", "panel", "round", "solid", "tall", "thick", "vkey", "wide"}
-
-def load_user_styles(config_dir: Path, omarchy_styles: dict = None):
-    """
-    Load TUI style overrides from user theme file.
-    Returns dict with style values merged over defaults.
-    Priority: defaults -> omarchy auto-detect -> user theme.toml
-    """
-    styles = dict(DEFAULT_STYLES)
-
-    # Apply Omarchy auto-detected styles over defaults
-    if omarchy_styles:
-        for key, value in omarchy_styles.items():
-            if key in DEFAULT_STYLES:
-                styles[key] = value
-
-    if tomllib is None:
-        return styles
-
-    theme_file = config_dir / "theme.toml"
-    if not theme_file.exists():
-        return styles
-
-    try:
-        with open(theme_file, "rb") as f:
-            data = tomllib.load(f)
-
-        user_styles = data.get("styles", {})
-        for key, value in user_styles.items():
-            # Normalize key: allow hyphens or underscores
-            norm_key = key.replace("-", "_")
-            if norm_key in DEFAULT_STYLES:
-                str_val = str(value)
-                # Validate border styles
-                if norm_key in ("dialog_border", "section_border"):
-                    if str_val.lower() not in VALID_BORDER_STYLES:
-                        continue
-                    str_val = str_val.lower()
-                styles[norm_key] = str_val
-    except Exception:
-        pass
-
-    return styles
-
-def build_css(styles: dict) -> str:
-    """Build Textual CSS string from style configuration."""
-    return f"""
-    PasswordScreen, HiddenNetworkScreen, Wired8021xScreen {{ align: center middle; }}
-    #dialog {{ width: {styles['dialog_width']}; height: auto; border: {styles['dialog_border']} $accent; background: $background; padding: {styles['dialog_padding']}; }}
-    #title {{ text-style: {styles['title_text_style']}; color: $accent; margin-bottom: 1; }}
-    .section {{ border: {styles['section_border']} $accent; margin: {styles['section_margin']}; padding: {styles['section_padding']}; }}
-    .section-title {{ text-style: {styles['section_title_text_style']}; color: $accent; background: $background; padding: {styles['section_title_padding']}; }}
-    #device-section, #station-section {{ height: {styles['info_section_height']}; }}
-    Static {{ height: auto; }}
-    Input {{ height: {styles['input_height']}; margin-bottom: 1; }}
-    Select {{ height: {styles['input_height']}; margin-bottom: 1; }}
-    Horizontal {{ height: auto; margin-top: 1; }}
-    Button {{ min-width: {styles['button_min_width']}; }}
-
-    /* DataTable selection/cursor colors */
-    DataTable > .datatable--cursor {{
-        background: $accent {styles['cursor_opacity']};
-        color: $foreground;
-    }}
-
-    DataTable > .datatable--hover {{
-        background: $accent {styles['hover_opacity']};
-    }}
-    """
-
-def try_create_user_theme_template(config_dir: Path):
-    """If file doesn't exist, create a template theme.toml file with commented examples"""
-    theme_file = config_dir / "theme.toml"
-    theme_dir = theme_file.parent
-    
-    # Create directory if it doesn't exist
-    theme_dir.mkdir(parents=True, exist_ok=True)
-    
-    if not theme_file.exists():
-        template_content = """# Gazelle Theme Configuration
-# Uncomment and modify these values to customize your theme
-# Colors should be in hex format (#RRGGBB) or 0xRRGGBB
-[colors.primary]
-#foreground = "#D8DEE9"
-#background = "#2E3440"
-[colors.normal]
-#black = "#3B4252"
-#red = "#BF616A"
-#green = "#A3BE8C"
-#yellow = "#EBCB8B"
-#blue = "#5E81AC"
-#magenta = "#B48EAD"
-#cyan = "#88C0D0"
-#white = "#E5E9F0"
-[colors.bright]
-#black = "#4C566A"
-#red = "#D08770"
-#green = "#8FBCBB"
-#yellow = "#EBCB8B"
-#blue = "#81A1C1"
-#magenta = "#B48EAD"
-#cyan = "#8FBCBB"
-#white = "#ECEFF4"
-
-# TUI Style Overrides
-# Uncomment and modify these values to customize borders, spacing, etc.
-# Border styles: ascii, blank, dashed, double, heavy, hidden, hkey, inner,
-#   none, outer, panel, round, solid, tall, thick, vkey, wide
-# Spacing values use Textual CSS units (e.g. "1 2" = 1 vertical, 2 horizontal)
-[styles]
-#dialog_border = "solid"
-#dialog_width = "60"
-#dialog_padding = "1 2"
-#section_border = "solid"
-#section_margin = "1 2"
-#section_padding = "0 1"
-#section_title_padding = "0 1"
-#info_section_height = "5"
-#input_height = "3"
-#button_min_width = "12"
-#cursor_opacity = "30%"
-#hover_opacity = "20%"
-#title_text_style = "bold"
-#section_title_text_style = "bold"
-"""
-        with open(theme_file, "w") as f:
-            f.write(template_content)
-        return True
-    return False
-
-class Gazelle(App):
+class Gazelle(NetworkWorkerMixin, App):
     ansi_color = True  # Enable terminal ANSI color support
 
     TITLE = "Gazelle"
-    CONFIG_DIR = Path.home() / ".config" / "gazelle"
+    CONFIG_DIR = CONFIG_DIR
     CONFIG_FILE = CONFIG_DIR / "config.json"
-
-    # Load styles: defaults -> omarchy auto-detect -> user overrides
-    _omarchy_styles = load_omarchy_styles()
-    _user_styles = load_user_styles(CONFIG_DIR, _omarchy_styles)
-    CSS = build_css(_user_styles)
+    snapshot = None  # Last NetworkSnapshot rendered
+    monitor = None  # NetworkMonitor pushing NetworkManager events
+    scanner = None  # ScanEngine for user-requested rescans
+    snapshot_source = staticmethod(get_snapshot)  # Or DaemonFeed.fetch when attached
+    REFRESH_DEBOUNCE = 0.25  # Seconds to coalesce bursts of events into one refresh
+    LINK_INTERVAL = 2  # Seconds between sysfs samples for the Device table's traffic columns
+    _refresh_pending = False
+    expanded = set()  # SSIDs whose BSSIDs are listed in the Known/New tables
+    _row_ssid = {}  # Known/New row key -> SSID
+    signal_history = None  # SignalHistory fed by snapshots and strength events
+    connect_job = None  # ConnectJob of the connection attempt in progress
+    connect_timeout = CONNECT_TIMEOUT  # Seconds, or connect_timeout in config.json
+    startup_marks = None  # [(label, perf_counter)] when run with --startup-profile
     BINDINGS = [
         Binding("q", "quit", "Quit"),
         Binding("j", "cursor_down", show=False),
@@ -653,17 +593,32 @@ class Gazelle(App):
         Binding("tab", "switch_section", "Switch"),
         Binding("space", "select", "Connect"),
         Binding("s", "scan", "Scan"),
+        Binding("escape", "cancel", show=False),
         Binding("d", "disconnect", "Disconnect"),
         Binding("r", "forget", "Forget"),
+        Binding("x", "expand", "APs"),
         Binding("h", "hidden", "Hidden"),
         Binding("v", "vpn_screen", "VPN"),
         Binding("w", "wwan_screen", "WWAN"),
         Binding("ctrl+r", "toggle_wifi", "WiFi"),
         Binding("ctrl+b", "toggle_wwan_radio", "WWAN Radio"),
         Binding("e", "wired_8021x", "802.1X Wired"),
+        Binding("t", "connect_times", "Timings"),
         Binding("?", "help", "Help"),
     ]
     
+    def __init__(self, theme_loader=None, startup_marks=None) -> None:
+        super().__init__()
+        # Theme files may already be loading on a thread started by the launcher
+        self._theme = (theme_loader or ThemeLoader(self.CONFIG_DIR)).result()
+        self.CSS = self._theme["css"]
+        self.startup_marks = startup_marks
+        self.mark_startup("app created")
+
+    def mark_startup(self, label) -> None:
+        if self.startup_marks is not None:
+            self.startup_marks.append((label, time.perf_counter()))
+
     def compose(self) -> ComposeResult:
         yield Header()
         yield ScrollableContainer(
@@ -679,10 +634,9 @@ class Gazelle(App):
         yield Footer()
     
     def on_mount(self) -> None:
-        # Try to load Omarchy colors
-        omarchy_colors = load_omarchy_colors()
-        # Try to load custom theme
-        user_colors = load_user_colors(self.CONFIG_DIR)
+        # Omarchy and custom colors were read with the CSS (see theme.load_theme)
+        omarchy_colors = self._theme["omarchy_colors"]
+        user_colors = self._theme["user_colors"]
         if user_colors:
             # Register theme with exact RGB values
             self.register_theme(
@@ -737,6 +691,8 @@ class Gazelle(App):
         # Load saved theme or use default
         config = self.load_config()
         saved_theme = config.get("theme", default_theme)
+        if isinstance(config.get("connect_timeout"), (int, float)) and config["connect_timeout"] > 0:
+            self.connect_timeout = config["connect_timeout"]
 
         # If config requests user-theme but colors couldn't be loaded
         # (e.g. first run before theme.toml is customized, or Nix-managed config),
@@ -761,21 +717,54 @@ class Gazelle(App):
         except Exception:
             self.theme = default_theme
         
-        self.query_one("#dev").add_columns("Name", "Mode", "Powered", "Address")
+        add_keyed_columns(self.query_one("#dev"), "Name", "Mode", "Powered", "Address",
+                          "Link", "RX", "TX", "Err/Drop")
         self.query_one("#dev").cursor_type = "none"
-        self.query_one("#sta").add_columns("State", "Scanning", "Frequency", "Security")
+        self.links = LinkMeter()
+        self.signal_history = SignalHistory()
+        self.set_interval(self.LINK_INTERVAL, self.update_link_stats)
+        add_keyed_columns(self.query_one("#sta"), "State", "Scanning", "Frequency", "Security")
         self.query_one("#sta").cursor_type = "none"
-        self.query_one("#known").add_columns("Name", "Security", "Signal")
-        self.query_one("#new").add_columns("Name", "Security", "Signal")
-        
-        # Show placeholder while scanning
-        new_table = self.query_one("#new")
-        new_table.add_row("Scanning for networks...", "", "")
+        for table_id in ("#known", "#new"):
+            t = self.query_one(table_id)
+            t.add_column("", key="expand", width=1)
+            add_keyed_columns(t, "Name", "Security", "Signal", "Trend", "Channel", "Rate")
         
-        # Trigger async network scan
-        self.run_worker(self.scan_networks_async, exclusive=True)
+        # Paint the last run's networks at once, marked stale until live data arrives
+        cached = load_snapshot()
+        if cached:
+            self.refresh_all(cached)
+            self.sub_title = f"cached {age_text(time.time() - cached.taken_at)} ago"
+        else:
+            # Show placeholder while scanning
+            new_table = self.query_one("#new")
+            new_table.add_row("", "Scanning for networks...", "", "", "", "", "")
         
         self.query_one("#new").focus()
+        self.mark_startup("mounted")
+
+        # Paint the layout first; NetworkManager is contacted afterwards
+        self.call_after_refresh(self.start_network)
+
+    def start_network(self) -> None:
+        """Load the first snapshot and start listening for changes"""
+        self.mark_startup("first paint")
+        # A running `gazelle --daemon` already holds the snapshot and pushes changes
+        feed = DaemonFeed(lambda event: self.post_message(NetworkChanged(event)))
+        if feed.start():
+            self.monitor = feed
+            self.snapshot_source = feed.fetch
+            self.request_refresh()
+        else:
+            self.request_refresh()
+            self.watch_network()
+        self.scanner = ScanEngine(lambda fresh: self.post_message(ScanFinished(fresh)))
+
+    def watch_network(self) -> None:
+        """Keep tables current from NetworkManager events instead of polling"""
+        self.snapshot_source = get_snapshot
+        self.monitor = NetworkMonitor(lambda event: self.post_message(NetworkChanged(event)))
+        self.run_worker(self.monitor.start, thread=True, group="monitor")
 
     def load_config(self) -> dict:
         """Load configuration from ~/.config/gazelle/config.json
@@ -820,93 +809,190 @@ class Gazelle(App):
         self.save_config(config)
         self.log.info(f"Theme changed to: {new_theme}")
     
+    def on_unmount(self) -> None:
+        if self.monitor:
+            self.monitor.stop()
+        if self.scanner:
+            self.scanner.cancel()
+
+    def request_refresh(self) -> None:
+        """Reload the snapshot in the background"""
+        self.run_worker(self.scan_networks_async, exclusive=True, group="refresh")
+
+    def schedule_refresh(self) -> None:
+        """Refresh once after a burst of NetworkManager events settles"""
+        if self._refresh_pending:
+            return
+        self._refresh_pending = True
+        self.set_timer(self.REFRESH_DEBOUNCE, self._flush_refresh)
+
+    def _flush_refresh(self) -> None:
+        self._refresh_pending = False
+        self.request_refresh()
+
+    def on_network_op_done(self, message: NetworkOpDone) -> None:
+        """Report a finished network operation and refresh the tables"""
+        if message.text:
+            self.notify(message.text)
+        if self.connect_job and self.connect_job.done:
+            self.connect_job = None
+            self.sub_title = ""
+        self.request_refresh()
+
+    def run_connect(self, label, done, func, *args) -> None:
+        """Run a connect_* call as a ConnectJob whose states show in the header"""
+        job = ConnectJob(self.connect_timeout, label=label)
+        job.on_state = lambda state: self.call_from_thread(self._show_connect_state, job, state)
+        self.connect_job = job
+        self.sub_title = f"{label}: connecting · Esc to cancel"
+        self.run_network_op(None, done, job.run, func, *args)
+
+    def _show_connect_state(self, job, state) -> None:
+        if job is self.connect_job and not job.done:
+            self.sub_title = f"{job.label}: {state} · Esc to cancel"
+
+    def _clear_stale_title(self) -> None:
+        """Drop the "cached ... ago" note once live data is on screen"""
+        if self.connect_job is None or self.connect_job.done:
+            self.sub_title = ""
+
+    def on_network_changed(self, message: NetworkChanged) -> None:
+        """Apply a NetworkManager event to the tables"""
+        event = message.event
+        if event['kind'] == 'snapshot':
+            self.refresh_all(event['snapshot'])
+            self._clear_stale_title()
+            return
+        if event['kind'] == 'detached':
+            self.watch_network()  # The daemon stopped; watch NetworkManager ourselves
+            self.request_refresh()
+            return
+        if event['kind'] == 'strength' and self._update_signal(event['path'], event['signal']):
+            return
+        self.schedule_refresh()
+
+    def _update_signal(self, ap_path, signal) -> bool:
+        """Update Signal cells in place; False if a refresh is needed instead"""
+        if not self.snapshot:
+            return False
+        networks = self.snapshot.networks
+        for i, n in enumerate(networks):
+            for j, ap in enumerate(n.aps):
+                if ap.path != ap_path:
+                    continue
+                self.signal_history.add(ap.bssid, signal)
+                is_best = n.path == ap_path
+                if not is_best and signal > n.signal:
+                    return False  # Another BSSID now beats the one shown; re-rank
+                ap = ap._replace(signal=signal)
+                aps = n.aps[:j] + (ap,) + n.aps[j + 1:]
+                networks[i] = ap._replace(aps=aps) if is_best else n._replace(aps=aps)
+                for t in (self.query_one("#known"), self.query_one("#new")):
+                    if is_best and n.ssid in t.rows:
+                        t.update_cell(n.ssid, "signal", f"{signal}%")
+                        t.update_cell(n.ssid, "trend", self._trend(ap))
+                    if bssid_key(ap) in t.rows:
+                        t.update_cell(bssid_key(ap), "signal", f"{signal}%")
+                        t.update_cell(bssid_key(ap), "trend", self._trend(ap))
+                return True
+        return False
+
     async def scan_networks_async(self) -> None:
         """Async WiFi network scanning in background"""
         try:
-            # Run blocking get_wifi_list() in background thread
-            await asyncio.to_thread(get_wifi_list)
+            # Run blocking get_snapshot() in background thread
+            snapshot = await asyncio.to_thread(self.snapshot_source)
             # Update UI with results
-            self.refresh_all()
+            self.refresh_all(snapshot)
+            self._clear_stale_title()
+            await asyncio.to_thread(save_snapshot, snapshot)
         except Exception as e:
             self.notify(f"Scan failed: {str(e)}")
+        if self.startup_marks is not None:
+            # Profiling a cold start ends once the networks are on screen
+            self.mark_startup("networks shown")
+            self.exit()
     
-    def refresh_all(self) -> None:
+    def refresh_all(self, snapshot=None) -> None:
+        """Render all four tables from one network snapshot"""
+        if snapshot is None:
+            snapshot = get_snapshot()
+        if snapshot is not self.snapshot:  # Re-renders of the same data add no samples
+            self.signal_history.add_networks(snapshot.networks)
+        self.snapshot = snapshot
+
         # Device
-        t = self.query_one("#dev")
-        t.clear()
-        iface = get_wifi_interface()
-        try:
-            mac = subprocess.run(['cat', f'/sys/class/net/{iface}/address'], 
-                                capture_output=True, text=True).stdout.strip()
-        except:
-            mac = "-"
-        t.add_row(iface, "station", "On" if wifi_enabled() else "Off", mac)
+        wifi_state = "On" if snapshot.wifi_enabled else "Off"
+        rows = [(iface, "station", wifi_state, snapshot.hwaddr(iface),
+                 *link_cells(self.links.latest(iface) or self.links.sample(iface)))
+                for iface in snapshot.interfaces('wifi') or [snapshot.wifi_interface]]
         
         # Add WWAN status if wwan device exists
-        try:
-            # Use nmcli to detect if any gsm/wwan device exists
-            r = subprocess.run(['nmcli', '-t', '-f', 'DEVICE,TYPE', 'device'], 
-                             capture_output=True, text=True)
-            wwan_iface = None
-            for line in r.stdout.strip().split('\n'):
-                if ':gsm' in line:
-                    wwan_iface = line.split(':')[0]
-                    break
-            
-            if wwan_iface:
-                # Try to get MAC or IMEI? Just show iface for now
-                t.add_row(wwan_iface, "wwan", "On" if wwan_enabled() else "Off", "-")
-        except:
-            pass
+        wwan_iface = snapshot.interface('gsm')
+        if wwan_iface:
+            # Try to get MAC or IMEI? Just show iface for now
+            rows.append((wwan_iface, "wwan", "On" if snapshot.wwan_enabled else "Off", "-",
+                         *link_cells(self.links.latest(wwan_iface) or self.links.sample(wwan_iface))))
+        sync_table(self.query_one("#dev"), rows)
         
         # Station
-        t = self.query_one("#sta")
-        t.clear()
-        i = get_station_info()
-        t.add_row(i['state'], i['scanning'], i['frequency'], i['security'])
+        i = snapshot.station_info()
+        if self.scanner and self.scanner.scanning:
+            i['scanning'] = 'true'
+        sync_table(self.query_one("#sta"),
+                   [(i['state'], i['scanning'], i['frequency'], i['security'])], key_column="state")
         
         # Known (only show networks that are in range)
-        t = self.query_one("#known")
-        t.clear()
-        known_ssids = set()
-        try:
-            r = subprocess.run(['nmcli', '-t', '-f', 'NAME,TYPE', 'connection', 'show'],
-                              capture_output=True, text=True)
-            avail = {n['ssid']: n for n in get_wifi_list()}
-            for line in r.stdout.strip().split('\n'):
-                if ':802-11-wireless' in line or ':wifi' in line:
-                    name = line.split(':')[0]
-                    known_ssids.add(name)
-                    # Only show if network is in range
-                    if name in avail:
-                        s = avail[name]['security']
-                        if is_enterprise(s):
-                            sec = "802.1x"
-                        elif is_owe(s):
-                            sec = "owe"
-                        elif s:
-                            sec = "psk"
-                        else:
-                            sec = "-"
-                        sig = f"{avail[name]['signal']}%"
-                        t.add_row(name, sec, sig)
-        except:
-            pass
+        self._row_ssid = {}
+        sync_table(self.query_one("#known"), self._network_rows(snapshot.known_networks()))
         
         # New (exclude networks that are already known)
-        t = self.query_one("#new")
-        t.clear()
-        for n in get_wifi_list():
-            if n['ssid'] not in known_ssids:
-                if is_enterprise(n['security']):
-                    sec = "802.1x"
-                elif is_owe(n['security']):
-                    sec = "owe"
-                elif n['security']:
-                    sec = "psk"
-                else:
-                    sec = "-"
-                t.add_row(n['ssid'], sec, f"{n['signal']}%")
+        sync_table(self.query_one("#new"), self._network_rows(snapshot.new_networks()))
+
+    def update_link_stats(self) -> None:
+        """Sample sysfs counters and update the Device table's traffic cells"""
+        table = self.query_one("#dev")
+        for row_key in list(table.rows):
+            cells = link_cells(self.links.sample(row_key.value))
+            for column, value in zip(LINK_COLUMNS, cells):
+                if table.get_cell(row_key, column) != value:
+                    table.update_cell(row_key, column, value)
+
+    def _network_rows(self, networks):
+        """Known/New rows showing each SSID's best AP, plus every BSSID if expanded"""
+        rows = []
+        for n in networks:
+            marker = ""
+            if len(n.aps) > 1:
+                marker = "▾" if n.ssid in self.expanded else "▸"
+            rows.append((marker, n.ssid, n.security_class, f"{n.signal}%", self._trend(n),
+                         channel_text(n), rate_text(n)))
+            self._row_ssid[n.ssid] = n.ssid
+            if marker == "▾":
+                for ap in n.aps:
+                    key = bssid_key(ap)
+                    rows.append(("*" if ap.connected else "", key, ap.security_class,
+                                 f"{ap.signal}%", self._trend(ap), channel_text(ap), rate_text(ap)))
+                    self._row_ssid[key] = n.ssid
+        return rows
+
+    def _trend(self, ap):
+        return sparkline(self.signal_history.samples(ap.bssid))
+
+    def _cursor_ssid(self, t):
+        """SSID of the Known/New row under the cursor, or None"""
+        if not 0 <= t.cursor_row < t.row_count:
+            return None
+        row_key = t.coordinate_to_cell_key(t.cursor_coordinate).row_key
+        return self._row_ssid.get(row_key.value)
+
+    def action_expand(self) -> None:
+        """Show or hide every BSSID of the SSID under the cursor"""
+        ssid = self._cursor_ssid(self._get_focused_table())
+        if ssid is None or not self.snapshot:
+            return
+        self.expanded = self.expanded ^ {ssid}
+        self.refresh_all(self.snapshot)
     
     def _get_focused_table(self):
         """Get the currently focused table"""
@@ -936,45 +1022,64 @@ class Gazelle(App):
             known.focus()
     
     def action_scan(self) -> None:
-        self.notify("Scanning...")
-        subprocess.run(['nmcli', 'device', 'wifi', 'rescan'], capture_output=True)
-        self.run_worker(self.scan_networks_async, exclusive=True)
+        """Start a rescan; presses while one is running merge into it"""
+        if self.snapshot and not self.snapshot.wifi_enabled:
+            self.notify("WiFi is off")
+            return
+        if self.scanner and self.scanner.request():
+            self.notify("Scanning...")
+            self._show_scanning("true")
+
+    def action_cancel(self) -> None:
+        """Esc: stop the connection attempt in progress, else the scan"""
+        if self.connect_job and not self.connect_job.done:
+            self.connect_job.cancel()
+            self.sub_title = f"{self.connect_job.label}: cancelling"
+        elif self.scanner and self.scanner.scanning:
+            self.scanner.cancel()
+            self._show_scanning("false")
+            self.notify("Scan cancelled")
+
+    def on_scan_finished(self, message: ScanFinished) -> None:
+        """Render results only once NetworkManager has finished scanning"""
+        if not message.fresh:
+            self.notify("Scan timed out, showing cached results")
+        self.request_refresh()
+
+    def _show_scanning(self, value) -> None:
+        """Update the Station table's Scanning cell in place"""
+        t = self.query_one("#sta")
+        if t.row_count:
+            t.update_cell(t.coordinate_to_cell_key((0, 0)).row_key, "scanning", value)
     
     def action_select(self) -> None:
         t = self._get_focused_table()
         is_known = self.query_one("#known").has_focus
         
-        if t.cursor_row >= 0 and t.cursor_row < t.row_count:
-            row = t.get_row_at(t.cursor_row)
-            ssid, sec = str(row[0]), str(row[1])
+        ssid = self._cursor_ssid(t)
+        if ssid is not None:
+            sec = str(t.get_cell(ssid, "security"))
             
             if is_known:
-                self.notify(f"Connecting...")
-                r = subprocess.run(['nmcli', 'connection', 'up', ssid], 
-                                  capture_output=True, text=True)
-                self.notify("✓ Connected" if r.returncode == 0 else "✗ Failed")
-                self.refresh_all()
+                profile = self.snapshot.profile_for(ssid)
+                self.run_connect(ssid, connected_text, connect_saved, profile.uuid if profile else ssid)
             else:
                 if sec == "802.1x":
                     self.push_screen(PasswordScreen(ssid, is_enterprise=True), self.handle_connect)
                 elif sec == "psk":
                     self.push_screen(PasswordScreen(ssid, is_enterprise=False), self.handle_connect)
                 else:  # Open or OWE - NetworkManager handles OWE automatically
-                    ok, msg = connect_wifi(ssid, "", hidden=False)
-                    self.notify("✓ Connected" if ok else f"✗ {msg}")
-                    self.refresh_all()
+                    self.run_connect(ssid, connected_text, connect_wifi, ssid, "", False)
     
     def handle_connect(self, result) -> None:
         if not result:
             return
         ssid, pwd, user, is_ent, eap, phase2, is_hidden = result
-        self.notify("Connecting...")
         if is_ent:
-            ok, msg = connect_802_1x(ssid, user, pwd, eap or "peap", phase2 or "mschapv2", is_hidden)
+            self.run_connect(ssid, connected_text, connect_802_1x,
+                             ssid, user, pwd, eap or "peap", phase2 or "mschapv2", is_hidden)
         else:
-            ok, msg = connect_wifi(ssid, pwd, is_hidden)
-        self.notify("✓ Connected" if ok else f"✗ {msg}")
-        self.refresh_all()
+            self.run_connect(ssid, connected_text, connect_wifi, ssid, pwd, is_hidden)
     
     def action_hidden(self) -> None:
         """Connect to hidden network (h key)"""
@@ -983,10 +1088,7 @@ class Gazelle(App):
                 return
             ssid, sec = result
             if sec == "open":
-                self.notify("Connecting...")
-                ok, msg = connect_wifi(ssid, "", hidden=True)
-                self.notify("✓ Connected" if ok else f"✗ {msg}")
-                self.refresh_all()
+                self.run_connect(ssid, connected_text, connect_wifi, ssid, "", True)
             elif sec == "psk":
                 self.push_screen(PasswordScreen(ssid, is_enterprise=False, is_hidden=True), self.handle_connect)
             else:  # 8021x
@@ -995,56 +1097,40 @@ class Gazelle(App):
         self.push_screen(HiddenNetworkScreen(), handle_hidden)
     
     def action_disconnect(self) -> None:
-        self.notify("Disconnected" if disconnect() else "Not connected")
-        self.refresh_all()
+        self.run_network_op(None, lambda ok: "Disconnected" if ok else "Not connected", disconnect)
     
     def action_forget(self) -> None:
         """Remove selected known network"""
         known = self.query_one("#known")
         if not known.has_focus or known.row_count == 0:
             return
-        if known.cursor_row < 0 or known.cursor_row >= known.row_count:
-            return
-        row = known.get_row_at(known.cursor_row)
-        ssid = str(row[0]).strip()
+        ssid = self._cursor_ssid(known)
         if not ssid:
             return
-        success = forget_network(ssid)
-        self.notify("✓ Network forgotten" if success else "✗ Failed")
-        self.refresh_all()
+        self.run_network_op(None, lambda ok: "✓ Network forgotten" if ok else "✗ Failed",
+                            forget_network, ssid)
 
     def action_toggle_wifi(self) -> None:
-        self.notify(f"WiFi {'ON' if toggle_wifi() else 'OFF'}")
-        self.set_timer(1, self.refresh_all)
+        self.run_network_op(None, lambda on: f"WiFi {'ON' if on else 'OFF'}", toggle_wifi)
         
     def action_toggle_wwan_radio(self) -> None:
-        try:
-            with open("/tmp/gazelle_debug.log", "a") as f:
-                f.write(f"Action Toggle WWAN Triggered. HAS_DBUS: {HAS_DBUS}\n")
-            
-            result = toggle_wwan()
-            msg = "ON" if result else "OFF"
-            
-            with open("/tmp/gazelle_debug.log", "a") as f:
-                f.write(f"Toggle Result: {result} -> {msg}\n")
-                
-            self.notify(f"WWAN {msg}")
-            self.set_timer(1, self.refresh_all)
-        except Exception as e:
-            with open("/tmp/gazelle_debug.log", "a") as f:
-                f.write(f"Action Error: {e}\n")
+        self.run_network_op(None, lambda on: f"WWAN {'ON' if on else 'OFF'}", toggle_wwan)
     
     def action_vpn_screen(self) -> None:
         """Open VPN management screen"""
         self.push_screen(VPNScreen())
 
+    def action_connect_times(self) -> None:
+        """Open the connection timing breakdown (t key)"""
+        self.push_screen(ConnectTimesScreen())
+
     def action_wwan_screen(self) -> None:
         """Open WWAN management screen"""
         self.push_screen(WWANScreen())
 
     def action_wired_8021x(self) -> None:
         """Open wired 802.1X connection dialog"""
-        iface = get_ethernet_interface()
+        iface = self.snapshot.interface('ethernet') if self.snapshot else get_ethernet_interface()
         if not iface:
             self.notify("No Ethernet interface found")
             return
@@ -1055,10 +1141,8 @@ class Gazelle(App):
         if not result:
             return
         con_name, user, pwd, eap, phase2 = result
-        self.notify("Connecting...")
-        ok, msg = connect_802_1x_wired(con_name, user, pwd, eap or "peap", phase2 or "mschapv2")
-        self.notify("✓ Connected" if ok else f"✗ {msg}")
-        self.refresh_all()
+        self.run_connect(con_name, connected_text, connect_802_1x_wired,
+                         con_name, user, pwd, eap or "peap", phase2 or "mschapv2")
 
     def action_help(self) -> None:
-        self.notify("j/k:Move Tab:Switch Space:Connect s:Scan h:Hidden v:VPN e:802.1X Wired d:Disconnect r:Forget q:Quit", timeout=5)
+        self.notify("j/k:Move Tab:Switch Space:Connect s:Scan Esc:Cancel x:APs h:Hidden v:VPN e:802.1X Wired t:Timings d:Disconnect r:Forget q:Quit", timeout=5)
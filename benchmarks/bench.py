@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Gazelle benchmarks against a stand-in NetworkManager
+
+Times the hot paths at several access point counts:
+  parse          nmcli terse output -> grouped networks, in process
+  get_wifi_list  the full query through the fake nmcli (or fake D-Bus service)
+  get_snapshot   every query the main screen needs
+  refresh_all    filling the four tables from a snapshot, then updating them
+  render         the screen refresh that follows refresh_all
+  startup        process start until the networks are on screen
+
+    python benchmarks/bench.py [--sizes 10,100,1000] [--repeat 5] [--json] [--dbus]
+
+By default network.py talks to benchmarks/bin/nmcli and mmcli. --dbus
+instead runs benchmarks/fake_nm.py on a private session bus (needs
+dbus-daemon, dbus-python and PyGObject).
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# Keep gazelle away from the real caches, config and daemon socket
+_scratch = tempfile.mkdtemp(prefix="gazelle-bench-")
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+for var in ('HOME', 'XDG_CACHE_HOME', 'XDG_RUNTIME_DIR'):
+    os.environ[var] = os.path.join(_scratch, var.lower())
+    os.makedirs(os.environ[var], exist_ok=True)
+os.environ['PATH'] = os.path.join(BENCH_DIR, 'bin') + os.pathsep + os.environ['PATH']
+
+sys.path.insert(0, REPO_DIR)
+import network
+
+def measure(func, repeat):
+    """Run func `repeat` times; returns the timings in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def use_size(n):
+    """Point every data source at n synthetic APs and drop cached state"""
+    os.environ['GAZELLE_BENCH_APS'] = str(n)
+    network._backend = None
+    network.DEVICES.invalidate()
+    network.CONNECTIONS.invalidate()
+
+def terse_output(n):
+    """What `nmcli -t --escape yes -f ... device wifi list` prints for n APs"""
+    fields = ','.join(network.WIFI_LIST_FIELDS)
+    return subprocess.run(['nmcli', '-t', '--escape', 'yes', '-f', fields, 'device', 'wifi', 'list'],
+                          capture_output=True, text=True).stdout
+
+def bench_parse(n, repeat):
+    lines = terse_output(n).splitlines()
+    def parse():
+        network.group_networks([network.AccessPoint.from_nmcli(r)
+                                for r in network.parse_terse(lines, network.WIFI_LIST_FIELDS)])
+    return measure(parse, repeat)
+
+def bench_queries(n, repeat):
+    return {
+        'get_wifi_list': measure(network.get_wifi_list, repeat),
+        'get_snapshot': measure(network.get_snapshot, repeat),
+    }
+
+def jittered(snapshot, seed):
+    """The same snapshot with every signal moved a little, as after a rescan"""
+    data = json.loads(json.dumps(snapshot.to_dict()))
+    for i, net in enumerate(data['networks']):
+        for j, ap in enumerate(net['aps']):
+            ap['signal'] = max(1, min(100, ap['signal'] + (i + j + seed) % 7 - 3))
+        net['signal'] = net['aps'][0]['signal']
+    return network.NetworkSnapshot.from_dict(data)
+
+async def bench_tables(n, repeat):
+    import app
+    snapshot = network.get_snapshot()
+    results = {'refresh_all (fill)': [], 'refresh_all (update)': [], 'render': []}
+    for i in range(repeat):
+        gazelle = app.Gazelle()
+        async with gazelle.run_test(size=(120, 50)) as pilot:
+            await pilot.pause()
+            gazelle.refresh_all(network.NetworkSnapshot([], True, False, [], [], []))
+            await pilot.pause()
+            start = time.perf_counter()
+            gazelle.refresh_all(snapshot)
+            results['refresh_all (fill)'].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            await pilot.pause()
+            results['render'].append((time.perf_counter() - start) * 1000)
+            update = jittered(snapshot, i)
+            start = time.perf_counter()
+            gazelle.refresh_all(update)
+            results['refresh_all (update)'].append((time.perf_counter() - start) * 1000)
+    return results
+
+def bench_startup(n, repeat, use_dbus):
+    """Fresh interpreter, import, mount and first snapshot rendered"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--startup-child']
+    if use_dbus:
+        cmd.append('--dbus')
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+async def startup_child():
+    import app
+    gazelle = app.Gazelle()
+    async with gazelle.run_test() as pilot:
+        while gazelle.snapshot is None:
+            await pilot.pause(0.005)
+
+class FakeBus:
+    """A private session bus with fake_nm.py serving the current size"""
+
+    def __init__(self):
+        self.daemon = subprocess.Popen(['dbus-daemon', '--session', '--nofork', '--print-address=1'],
+                                       stdout=subprocess.PIPE, text=True)
+        os.environ['DBUS_SESSION_BUS_ADDRESS'] = self.daemon.stdout.readline().strip()
+        os.environ['GAZELLE_BUS'] = 'session'
+        self.service = None
+
+    def serve(self, n):
+        self.stop_service()
+        self.service = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, 'fake_nm.py')],
+                                        stdout=subprocess.PIPE, text=True)
+        self.service.stdout.readline()  # "ready"
+
+    def stop_service(self):
+        if self.service:
+            self.service.terminate()
+            self.service.wait()
+
+    def close(self):
+        self.stop_service()
+        self.daemon.terminate()
+
+def report(name, n, times, as_json):
+    record = {'benchmark': name, 'aps': n, 'median_ms': round(statistics.median(times), 3),
+              'min_ms': round(min(times), 3), 'runs': len(times)}
+    if as_json:
+        print(json.dumps(record), flush=True)
+    else:
+        print(f"{name:<22} {n:>5} APs  median {record['median_ms']:9.2f} ms  "
+              f"min {record['min_ms']:9.2f} ms", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000', help="comma separated AP counts")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="one JSON object per result")
+    parser.add_argument('--dbus', action='store_true', help="use the fake D-Bus service, not nmcli")
+    parser.add_argument('--startup-child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # The nmcli run must not reach a real NetworkManager over the system bus
+    network.HAS_DBUS = network.HAS_GLIB = args.dbus
+    if args.startup_child:
+        asyncio.run(startup_child())
+        return 0
+
+    bus = FakeBus() if args.dbus else None
+    try:
+        for n in (int(size) for size in args.sizes.split(',')):
+            use_size(n)
+            if bus:
+                bus.serve(n)
+            report('parse', n, bench_parse(n, args.repeat), args.json)
+            for name, times in bench_queries(n, args.repeat).items():
+                report(name, n, times, args.json)
+            for name, times in asyncio.run(bench_tables(n, args.repeat)).items():
+                report(name, n, times, args.json)
+            report('startup', n, bench_startup(n, args.repeat, args.dbus), args.json)
+    finally:
+        if bus:
+            bus.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
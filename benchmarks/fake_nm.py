@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Stand-in NetworkManager and ModemManager on the session bus
+
+Serves the synthetic state from synthetic.py with the D-Bus objects and
+properties network.NetworkManagerBackend reads. Run it on a private
+session bus and point gazelle at it with GAZELLE_BUS=session (bench.py
+does both). Needs dbus-python and PyGObject.
+"""
+import os
+import sys
+
+import dbus
+import dbus.mainloop.glib
+import dbus.service
+from gi.repository import GLib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import synthetic
+from network import (NM_BUS, NM_PATH, NM_SETTINGS_PATH, MM_BUS, MM_PATH, PROPS_IFACE, DEVICE_TYPES,
+                     ACTIVE_ACTIVATED, AP_FLAGS_PRIVACY, AP_SEC_KEY_MGMT_PSK, AP_SEC_KEY_MGMT_802_1X,
+                     AP_SEC_KEY_MGMT_SAE, AP_SEC_KEY_MGMT_OWE)
+
+DEVICE_TYPE_IDS = {name: number for number, name in DEVICE_TYPES.items()}
+# Flags that make ap_security() report the synthetic security strings
+SECURITY_FLAGS = {
+    '': (0, 0, 0),
+    'WPA2': (AP_FLAGS_PRIVACY, 0, AP_SEC_KEY_MGMT_PSK),
+    'WPA1 WPA2': (AP_FLAGS_PRIVACY, AP_SEC_KEY_MGMT_PSK, AP_SEC_KEY_MGMT_PSK),
+    'WPA3': (AP_FLAGS_PRIVACY, 0, AP_SEC_KEY_MGMT_SAE),
+    'WPA2 802.1X': (AP_FLAGS_PRIVACY, 0, AP_SEC_KEY_MGMT_802_1X),
+    'OWE': (0, 0, AP_SEC_KEY_MGMT_OWE),
+}
+
+def paths(objects):
+    return dbus.Array([o.path for o in objects], signature='o')
+
+class FakeObject(dbus.service.Object):
+    """Exported object whose properties live in a {interface: {name: value}} dict"""
+
+    def __init__(self, bus, path, props):
+        super().__init__(bus, path)
+        self.path = dbus.ObjectPath(path)
+        self.props = props
+
+    @dbus.service.method(PROPS_IFACE, in_signature='ss', out_signature='v')
+    def Get(self, interface, name):
+        return self.props[interface][name]
+
+    @dbus.service.method(PROPS_IFACE, in_signature='s', out_signature='a{sv}')
+    def GetAll(self, interface):
+        return dbus.Dictionary(self.props.get(interface, {}), signature='sv')
+
+    @dbus.service.method(PROPS_IFACE, in_signature='ssv')
+    def Set(self, interface, name, value):
+        self.props[interface][name] = value
+
+class AccessPoint(FakeObject):
+    def __init__(self, bus, index, ap):
+        flags, wpa, rsn = SECURITY_FLAGS[ap['security']]
+        super().__init__(bus, ap['path'], {NM_BUS + ".AccessPoint": {
+            'Ssid': dbus.ByteArray(ap['ssid'].encode()),
+            'HwAddress': ap['bssid'],
+            'Strength': dbus.Byte(ap['signal']),
+            'Flags': dbus.UInt32(flags),
+            'WpaFlags': dbus.UInt32(wpa),
+            'RsnFlags': dbus.UInt32(rsn),
+            'Frequency': dbus.UInt32(ap['frequency']),
+            'MaxBitrate': dbus.UInt32(ap['rate'] * 1000),
+        }})
+
+class Device(FakeObject):
+    def __init__(self, bus, index, iface, dev_type, access_points=()):
+        props = {NM_BUS + ".Device": {
+            'Interface': iface,
+            'DeviceType': dbus.UInt32(DEVICE_TYPE_IDS.get(dev_type, 0)),
+            'State': dbus.UInt32(100),
+            'ActiveConnection': dbus.ObjectPath("/"),
+            'HwAddress': f"02:00:00:00:00:{index:02X}",
+        }}
+        self.access_points = list(access_points)
+        if dev_type == 'wifi':
+            props[NM_BUS + ".Device.Wireless"] = {
+                'LastScan': dbus.Int64(1),
+                'ActiveAccessPoint': self.access_points[0].path if self.access_points else dbus.ObjectPath("/"),
+            }
+        super().__init__(bus, f"{NM_PATH}/Devices/{index}", props)
+
+    @dbus.service.method(NM_BUS + ".Device.Wireless", in_signature='', out_signature='ao')
+    def GetAllAccessPoints(self):
+        return paths(self.access_points)
+
+    @dbus.service.method(NM_BUS + ".Device.Wireless", in_signature='a{sv}')
+    def RequestScan(self, options):
+        wireless = self.props[NM_BUS + ".Device.Wireless"]
+        wireless['LastScan'] = dbus.Int64(wireless['LastScan'] + 1)
+
+    @dbus.service.method(NM_BUS + ".Device", in_signature='')
+    def Disconnect(self):
+        self.props[NM_BUS + ".Device"]['ActiveConnection'] = dbus.ObjectPath("/")
+
+class Connection(FakeObject):
+    def __init__(self, bus, index, settings):
+        super().__init__(bus, f"{NM_SETTINGS_PATH}/{index}", {})
+        self.settings = settings
+
+    @dbus.service.method(NM_BUS + ".Settings.Connection", in_signature='', out_signature='a{sa{sv}}')
+    def GetSettings(self):
+        return self.settings
+
+    @dbus.service.method(NM_BUS + ".Settings.Connection", in_signature='')
+    def Delete(self):
+        NetworkManager.instance.connections.remove(self)
+        self.remove_from_connection()
+
+class ActiveConnection(FakeObject):
+    def __init__(self, bus, index, connection, device):
+        con = connection.settings['connection']
+        super().__init__(bus, f"{NM_PATH}/ActiveConnection/{index}", {NM_BUS + ".Connection.Active": {
+            'Id': con['id'],
+            'Type': con['type'],
+            'Uuid': con['uuid'],
+            'Connection': connection.path,
+            'State': dbus.UInt32(ACTIVE_ACTIVATED),
+            'Devices': paths([device] if device else []),
+            'Vpn': con['type'] == 'vpn',
+        }})
+
+class Settings(FakeObject):
+    def __init__(self, bus, manager):
+        super().__init__(bus, NM_SETTINGS_PATH, {})
+        self.manager = manager
+
+    @dbus.service.method(NM_BUS + ".Settings", in_signature='', out_signature='ao')
+    def ListConnections(self):
+        return paths(self.manager.connections)
+
+    @dbus.service.method(NM_BUS + ".Settings", in_signature='a{sa{sv}}', out_signature='o')
+    def AddConnection(self, settings):
+        return self.manager.add_connection(settings).path
+
+class NetworkManager(FakeObject):
+    instance = None
+
+    def __init__(self, bus):
+        super().__init__(bus, NM_PATH, {NM_BUS: {
+            'WirelessEnabled': True, 'WirelessHardwareEnabled': True,
+            'WwanEnabled': True, 'WwanHardwareEnabled': True,
+            'ActiveConnections': dbus.Array([], signature='o'),
+            'State': dbus.UInt32(70),
+        }})
+        NetworkManager.instance = self
+        self.bus = bus
+        self._serial = 0
+        aps = [AccessPoint(bus, i, ap) for i, ap in enumerate(synthetic.make_aps())]
+        self.devices = [Device(bus, i, iface, dev_type, aps if dev_type == 'wifi' else ())
+                        for i, (iface, dev_type) in enumerate(synthetic.DEVICES)]
+        self.connections = []
+        self.active = []
+        self.settings = Settings(bus, self)
+        for con in synthetic.make_connections():
+            settings = {'connection': {'id': con['name'], 'type': con['type'], 'uuid': con['uuid']}}
+            if con['type'] == '802-11-wireless':
+                settings['802-11-wireless'] = {'ssid': dbus.ByteArray(con['name'].encode())}
+            connection = self.add_connection(settings)
+            if con['active']:
+                self.activate(connection, self.devices[0] if con['type'] == '802-11-wireless' else None)
+
+    def next_index(self):
+        self._serial += 1
+        return self._serial
+
+    def add_connection(self, settings):
+        settings = dbus.Dictionary(settings, signature='sa{sv}')
+        settings['connection'].setdefault('uuid', f"bench-{self._serial + 1}")
+        connection = Connection(self.bus, self.next_index(), settings)
+        self.connections.append(connection)
+        return connection
+
+    def activate(self, connection, device):
+        active = ActiveConnection(self.bus, self.next_index(), connection, device)
+        self.active.append(active)
+        self.props[NM_BUS]['ActiveConnections'] = paths(self.active)
+        if device:
+            device.props[NM_BUS + ".Device"]['ActiveConnection'] = active.path
+        return active
+
+    def device(self, path):
+        return next((d for d in self.devices if d.path == path), None)
+
+    @dbus.service.method(NM_BUS, in_signature='', out_signature='ao')
+    def GetDevices(self):
+        return paths(self.devices)
+
+    @dbus.service.method(NM_BUS, in_signature='ooo', out_signature='o')
+    def ActivateConnection(self, connection, device, specific_object):
+        con = next(c for c in self.connections if c.path == connection)
+        return self.activate(con, self.device(device)).path
+
+    @dbus.service.method(NM_BUS, in_signature='a{sa{sv}}oo', out_signature='oo')
+    def AddAndActivateConnection(self, settings, device, specific_object):
+        connection = self.add_connection(settings)
+        return connection.path, self.activate(connection, self.device(device)).path
+
+    @dbus.service.method(NM_BUS, in_signature='o')
+    def DeactivateConnection(self, active_path):
+        self.active = [a for a in self.active if a.path != active_path]
+        self.props[NM_BUS]['ActiveConnections'] = paths(self.active)
+
+class ModemManager(dbus.service.Object):
+    def __init__(self, bus):
+        super().__init__(bus, MM_PATH)
+
+    @dbus.service.method("org.freedesktop.DBus.ObjectManager", in_signature='',
+                         out_signature='a{oa{sa{sv}}}')
+    def GetManagedObjects(self):
+        modem = synthetic.MODEM
+        return {dbus.ObjectPath(MM_PATH + "/Modem/0"): {
+            MM_BUS + ".Modem": {
+                'SignalQuality': dbus.Struct((dbus.UInt32(modem['signal']), True)),
+                'AccessTechnologies': dbus.UInt32(1 << 14),  # LTE
+                'State': dbus.Int32(11),  # connected
+            },
+            MM_BUS + ".Modem.Modem3gpp": {'OperatorName': modem['operator']},
+        }}
+
+def main():
+    dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+    bus = dbus.SessionBus()
+    names = [dbus.service.BusName(NM_BUS, bus), dbus.service.BusName(MM_BUS, bus)]
+    objects = [NetworkManager(bus), ModemManager(bus)]
+    print("ready", flush=True)
+    GLib.MainLoop().run()
+
+if __name__ == '__main__':
+    main()
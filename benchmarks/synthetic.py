@@ -0,0 +1,52 @@
+"""Synthetic NetworkManager state shared by the fake nmcli and fake D-Bus service
+
+Everything is derived from the AP count (GAZELLE_BENCH_APS) and a fixed
+seed, so every process of a benchmark run sees the same networks.
+"""
+import os
+import random
+
+SEED = 1234
+BSSIDS_PER_SSID = 3
+SAVED_EVERY = 5  # Every 5th SSID has a saved profile
+CHANNELS = [(2412, 1), (2437, 6), (2462, 11), (5180, 36), (5240, 48), (5500, 100), (5745, 149)]
+SECURITY = ['WPA2', 'WPA2', 'WPA1 WPA2', 'WPA3', '', 'WPA2 802.1X', 'OWE']
+
+def ap_count():
+    return int(os.environ.get('GAZELLE_BENCH_APS', '100'))
+
+def make_aps(n=None, seed=SEED):
+    """n AP dicts in the shape of network.get_wifi_list() entries (before grouping)"""
+    n = ap_count() if n is None else n
+    rng = random.Random(seed)
+    aps = []
+    for i in range(n):
+        freq, chan = rng.choice(CHANNELS)
+        aps.append({
+            'ssid': f"net:{i // BSSIDS_PER_SSID:04d}",  # ':' exercises nmcli escaping
+            'bssid': "02:00:{:02X}:{:02X}:{:02X}:{:02X}".format(*(i >> s & 0xFF for s in (24, 16, 8, 0))),
+            'signal': rng.randint(5, 100),
+            'security': rng.choice(SECURITY),
+            'connected': i == 0,
+            'frequency': freq,
+            'channel': chan,
+            'rate': rng.choice([54, 130, 270, 540, 1200]),
+            'device': {'iface': 'wlan0', 'type': 'wifi'},
+            'path': f"/org/freedesktop/NetworkManager/AccessPoint/{i}",
+        })
+    return aps
+
+def make_connections(n=None):
+    """Saved profiles: every SAVED_EVERY-th SSID plus a VPN and a WireGuard tunnel"""
+    n = ap_count() if n is None else n
+    ssids = sorted({ap['ssid'] for ap in make_aps(n)})
+    connections = [{'name': ssid, 'type': '802-11-wireless', 'uuid': f"00000000-0000-0000-0000-{i:012d}",
+                    'active': i == 0}
+                   for i, ssid in enumerate(ssids) if i % SAVED_EVERY == 0]
+    connections.append({'name': 'work:vpn', 'type': 'vpn', 'uuid': 'vpn-0001', 'active': False})
+    connections.append({'name': 'wg0', 'type': 'wireguard', 'uuid': 'wg-0001', 'active': True})
+    return connections
+
+DEVICES = [('wlan0', 'wifi'), ('eth0', 'ethernet'), ('wwan0', 'gsm'), ('lo', 'loopback')]
+
+MODEM = {'signal': 67, 'operator': 'Bench Mobile', 'tech': 'lte', 'state': 'connected'}
@@ -0,0 +1,266 @@
+"""Gazelle command line - scriptable access to network.py without Textual
+
+Every command prints one record per line. With --json each line is a
+JSON object (JSON Lines), so status bars such as waybar or polybar can
+read `gazelle status --json --follow` as a stream.
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from network import *
+from daemon import daemon_socket, fetch_snapshot, subscribe_snapshots
+
+# Seconds to let a burst of NetworkManager events settle before re-printing
+FOLLOW_DEBOUNCE = 0.25
+
+def emit(record, as_json, text):
+    """Print one record as a JSON line or as text, flushed for pipes"""
+    print(json.dumps(record) if as_json else text, flush=True)
+
+def network_record(network, snapshot):
+    return {
+        'ssid': network.ssid,
+        'signal': network.signal,
+        'security': network.security_class,
+        'channel': network.channel,
+        'band': band_label(network.frequency or 0),
+        'connected': bool(network.connected),
+        'known': snapshot.profile_for(network.ssid) is not None,
+        'bssids': len(network.aps) or 1,
+    }
+
+def status_record(snapshot):
+    """Connection status; 'text' and 'class' follow waybar's JSON protocol"""
+    station = snapshot.station_info()
+    current = next((n for n in snapshot.networks if n.connected), None)
+    status = {
+        'state': station['state'],
+        'ssid': current.ssid if current else None,
+        'signal': current.signal if current else None,
+        'frequency': station['frequency'],
+        'security': station['security'],
+        'wifi': snapshot.wifi_enabled,
+        'wwan': snapshot.wwan_enabled,
+        'active': [c.name for c in snapshot.active],
+        'vpn': next((c.name for c in snapshot.active if c.type in VPN_TYPES), None),
+    }
+    status['text'] = status_text(status)
+    status['class'] = status['state']
+    return status
+
+def status_text(status):
+    if status['ssid']:
+        text = f"{status['ssid']} {status['signal']}%"
+    else:
+        text = status['state'] if status['wifi'] else "wifi off"
+    if status['vpn']:
+        text += f" [{status['vpn']}]"
+    return text
+
+def current_snapshot():
+    """Ask a running gazelle daemon first; it already holds the snapshot"""
+    return fetch_snapshot() or get_snapshot()
+
+def result_code(result):
+    """Print an (ok, message) result and turn it into an exit status"""
+    ok, message = result if isinstance(result, tuple) else (result, "")
+    if message:
+        print(str(message).strip(), file=sys.stdout if ok else sys.stderr)
+    return 0 if ok else 1
+
+def cmd_list(args):
+    if args.rescan:
+        scan_wifi()
+        snapshot = get_snapshot()
+    else:
+        snapshot = current_snapshot()
+    for network in snapshot.networks:
+        record = network_record(network, snapshot)
+        mark = "*" if record['connected'] else ("+" if record['known'] else " ")
+        emit(record, args.json, f"{mark} {record['signal']:>3}%  {record['security']:<6}  "
+                                f"{record['band']:<4}  {record['ssid']}")
+    return 0
+
+def cmd_status(args):
+    sock = daemon_socket() if args.follow else None
+    if sock is not None:
+        # The daemon pushes a snapshot on every change; print status changes
+        status = None
+        for snapshot in subscribe_snapshots(sock):
+            latest = status_record(snapshot)
+            if latest != status:
+                status = latest
+                emit(status, args.json, status['text'])
+        return 1  # The daemon went away
+
+    status = status_record(current_snapshot())
+    emit(status, args.json, status['text'])
+    if not args.follow:
+        return 0
+
+    events = queue.Queue()
+    monitor = NetworkMonitor(events.put)
+    if not monitor.start():
+        print("Cannot watch NetworkManager for changes", file=sys.stderr)
+        return 1
+    try:
+        while True:
+            events.get()
+            try:
+                while True:  # Coalesce the rest of the burst
+                    events.get(timeout=FOLLOW_DEBOUNCE)
+            except queue.Empty:
+                pass
+            latest = status_record(get_snapshot())
+            if latest != status:
+                status = latest
+                emit(status, args.json, status['text'])
+    finally:
+        monitor.stop()
+
+def run_job(job, func, *args):
+    """Run a ConnectJob on a thread so Ctrl+C can cancel it (deactivating the attempt)"""
+    result = []
+    finished = threading.Event()  # Thread.join() can return early once interrupted
+    def work():
+        try:
+            result.append(job.run(func, *args))
+        finally:
+            finished.set()
+    threading.Thread(target=work, daemon=True).start()
+    try:
+        while not finished.wait(0.1):
+            pass
+    except KeyboardInterrupt:
+        job.cancel()
+        finished.wait()
+    return result[0] if result else (False, "Cancelled")
+
+def cmd_connect(args):
+    password = sys.stdin.readline().rstrip("\n") if args.password == "-" else args.password
+    job = ConnectJob(args.timeout, label=args.ssid)
+    if sys.stderr.isatty():
+        job.on_state = lambda state: print(f"{args.ssid}: {state}", file=sys.stderr, flush=True)
+    profile = current_snapshot().profile_for(args.ssid)
+    if not args.hidden and not args.username and not args.password and profile:
+        return result_code(run_job(job, connect_saved, profile.uuid))
+    if args.username:
+        return result_code(run_job(job, connect_802_1x, args.ssid, args.username, password or "",
+                                   args.eap, args.phase2, args.hidden))
+    return result_code(run_job(job, connect_wifi, args.ssid, password or "", args.hidden))
+
+def cmd_disconnect(args):
+    return result_code(disconnect())
+
+def cmd_vpn(args):
+    if args.action == "list":
+        for vpn in get_vpn_list():
+            emit(vpn._asdict(), args.json, f"{'*' if vpn.active else ' '} {vpn.name}")
+        return 0
+    if not args.name:
+        print(f"gazelle vpn {args.action}: a connection name is required", file=sys.stderr)
+        return 2
+    if args.action == "up":
+        return result_code(connect_vpn(args.name))
+    return result_code(disconnect_vpn(args.name))
+
+def cmd_timings(args):
+    for entry in load_connect_log()[-args.last:]:
+        phases = "  ".join(f"{p['state']} {p['duration']:.1f}s" for p in entry['phases'])
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry['started']))
+        emit(entry, args.json, f"{when}  {'ok' if entry['ok'] else 'FAILED':<6}  "
+                               f"{entry['total']:6.1f}s  {entry['name']}  [{phases}]")
+    return 0
+
+def cmd_import(args):
+    from profiles import load_profiles, profile_settings
+    try:
+        specs = load_profiles(args.file)
+        batch = [profile_settings(spec, number) for number, spec in enumerate(specs, 1)]
+    except (OSError, ValueError) as e:
+        print(f"gazelle import: {e}", file=sys.stderr)
+        return 2
+    if args.dry_run:
+        for settings in batch:
+            emit(settings, True, "")
+        return 0
+    results = import_connections(batch)
+    for settings, (ok, message) in zip(batch, results):
+        name = settings['connection']['id']
+        emit({'name': name, 'ok': ok, 'message': message}, args.json,
+             f"{'+' if ok else '!'} {name}  {message}")
+    return 0 if all(ok for ok, message in results) else 1
+
+def cmd_export(args):
+    from profiles import dump_profiles, profile_spec
+    specs = [spec for spec in map(profile_spec, get_connection_settings(args.secrets)) if spec]
+    if args.json:
+        for spec in specs:
+            emit(spec, True, "")
+    else:
+        print(dump_profiles(specs), end="", flush=True)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="gazelle", description="NetworkManager from the command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("list", help="list WiFi networks in range")
+    p.add_argument("--json", action="store_true", help="one JSON object per line")
+    p.add_argument("--rescan", action="store_true", help="wait for a fresh scan first")
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("status", help="show the current connection")
+    p.add_argument("--json", action="store_true", help="one JSON object per line")
+    p.add_argument("-f", "--follow", action="store_true", help="print again whenever it changes")
+    p.set_defaults(func=cmd_status)
+
+    p = commands.add_parser("connect", help="connect to a WiFi network")
+    p.add_argument("ssid")
+    p.add_argument("-p", "--password", help="passphrase, or '-' to read it from stdin")
+    p.add_argument("--hidden", action="store_true", help="the network does not broadcast its SSID")
+    p.add_argument("-u", "--username", help="identity for 802.1X networks")
+    p.add_argument("--eap", default="peap", choices=["peap", "ttls", "tls"])
+    p.add_argument("--phase2", default="mschapv2", choices=["mschapv2", "mschap", "pap", "chap", "gtc", "md5"])
+    p.add_argument("-t", "--timeout", type=float, default=CONNECT_TIMEOUT,
+                   help=f"give up after this many seconds (default {CONNECT_TIMEOUT})")
+    p.set_defaults(func=cmd_connect)
+
+    p = commands.add_parser("disconnect", help="disconnect WiFi")
+    p.set_defaults(func=cmd_disconnect)
+
+    p = commands.add_parser("timings", help="where recent connection attempts spent their time")
+    p.add_argument("--json", action="store_true", help="one JSON object per line")
+    p.add_argument("-n", "--last", type=int, default=CONNECT_HISTORY, help="show only the newest N")
+    p.set_defaults(func=cmd_timings)
+
+    p = commands.add_parser("vpn", help="list, start or stop VPN connections")
+    p.add_argument("action", choices=["list", "up", "down"])
+    p.add_argument("name", nargs="?")
+    p.add_argument("--json", action="store_true", help="one JSON object per line")
+    p.set_defaults(func=cmd_vpn)
+
+    p = commands.add_parser("import", help="save the WiFi, wired and VPN profiles in a TOML file")
+    p.add_argument("file", help="profile file (see profiles.py), or '-' for stdin")
+    p.add_argument("--dry-run", action="store_true", help="print the settings instead of saving them")
+    p.add_argument("--json", action="store_true", help="one JSON object per line")
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser("export", help="print the saved profiles as a TOML profile file")
+    p.add_argument("--secrets", action="store_true", help="include passwords and keys")
+    p.add_argument("--json", action="store_true", help="one JSON object per line")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging()
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        return 0
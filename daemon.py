@@ -0,0 +1,199 @@
+"""Gazelle daemon - one NetworkManager subscription shared over a UNIX socket
+
+`gazelle --daemon` keeps the current NetworkSnapshot in memory, refreshes
+it when NetworkManager reports a change and serves it on SOCKET_PATH.
+Clients send one request line and read JSON lines back:
+  get        - the current snapshot, then the connection closes
+  subscribe  - the current snapshot, then a new one after every change
+Each reply line is NetworkSnapshot.to_dict() as JSON.
+"""
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from network import *
+
+SOCKET_PATH = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or f"/tmp/gazelle-{os.getuid()}",
+                           'gazelle.sock')
+
+# Seconds to let a burst of NetworkManager events settle before re-reading
+DAEMON_DEBOUNCE = 0.25
+# Re-read anyway this often; the nmcli monitor does not report signal changes
+DAEMON_REFRESH_INTERVAL = 30
+
+class SnapshotDaemon:
+    """Hold the latest snapshot and wake subscribers when it changes"""
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = path
+        self._events = queue.Queue()
+        self._changed = threading.Condition()
+        self._version = 0
+        self._line = None  # Current snapshot, encoded once for every client
+        self._state = None  # Snapshot contents without the timestamp
+
+    def current(self):
+        with self._changed:
+            return self._version, self._line
+
+    def wait_for_change(self, seen):
+        """Block until the snapshot differs from version `seen`"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != seen)
+            return self._version, self._line
+
+    def refresh(self):
+        data = get_snapshot().to_dict()
+        taken_at = data.pop('taken_at')
+        if data == self._state:
+            return
+        line = json.dumps(dict(data, taken_at=taken_at), separators=(',', ':')) + "\n"
+        with self._changed:
+            self._state = data
+            self._line = line.encode()
+            self._version += 1
+            self._changed.notify_all()
+
+    def serve_forever(self):
+        if daemon_socket(self.path):
+            print(f"gazelle daemon already running on {self.path}", file=sys.stderr)
+            return 1
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        if not private_dir(os.path.dirname(self.path)):
+            print(f"not serving on {self.path}: {os.path.dirname(self.path)} must be a directory "
+                  "owned by you with mode 0700", file=sys.stderr)
+            return 1
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Left behind by a daemon that did not shut down
+        # SIGTERM should still remove the socket on the way out
+        signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+
+        self.refresh()
+        server = DaemonServer(self.path, DaemonHandler)
+        server.daemon = self
+        monitor = NetworkMonitor(self._events.put)
+        monitor.start()
+        threading.Thread(target=server.serve_forever, name="daemon-server", daemon=True).start()
+        try:
+            while True:
+                try:
+                    self._events.get(timeout=DAEMON_REFRESH_INTERVAL)
+                    while True:  # Coalesce the rest of the burst
+                        self._events.get(timeout=DAEMON_DEBOUNCE)
+                except queue.Empty:
+                    pass
+                self.refresh()
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            monitor.stop()
+            server.server_close()
+            os.unlink(self.path)
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server.daemon
+        request = self.rfile.readline().strip().decode()
+        version, line = daemon.current()
+        try:
+            self.wfile.write(line)
+            while request == "subscribe":
+                version, line = daemon.wait_for_change(version)
+                self.wfile.write(line)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def private_dir(path):
+    """True if path is a real directory that only this user can enter
+
+    Without XDG_RUNTIME_DIR the socket lives under /tmp, where another
+    user could create the directory first and serve made-up snapshots.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+def daemon_socket(path=SOCKET_PATH):
+    """Connect to a running daemon, or return None"""
+    if not os.path.exists(path) or not private_dir(os.path.dirname(path)):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+def fetch_snapshot(path=SOCKET_PATH):
+    """The daemon's current snapshot, or None if no daemon is running"""
+    sock = daemon_socket(path)
+    if sock is None:
+        return None
+    try:
+        with sock, sock.makefile('rb') as f:
+            sock.sendall(b"get\n")
+            return NetworkSnapshot.from_dict(json.loads(f.readline()))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def subscribe_snapshots(sock):
+    """Yield every snapshot the daemon pushes on a connected socket"""
+    with sock, sock.makefile('rb') as f:
+        sock.sendall(b"subscribe\n")
+        for line in f:
+            yield NetworkSnapshot.from_dict(json.loads(line))
+
+class DaemonFeed:
+    """Receive snapshots from a running daemon instead of watching NetworkManager
+
+    Mirrors NetworkMonitor's start()/stop(). The callback gets
+      {'kind': 'snapshot', 'snapshot': NetworkSnapshot}
+      {'kind': 'detached'} once the daemon goes away
+    """
+
+    def __init__(self, callback, path=SOCKET_PATH):
+        self.callback = callback
+        self.path = path
+        self._sock = None
+
+    def start(self):
+        """Attach to the daemon; returns False when none is running"""
+        self._sock = daemon_socket(self.path)
+        if self._sock is None:
+            return False
+        threading.Thread(target=self._read, args=(self._sock,),
+                         name="daemon-feed", daemon=True).start()
+        return True
+
+    def stop(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def fetch(self):
+        """Current snapshot from the daemon, read directly if it has gone"""
+        return fetch_snapshot(self.path) or get_snapshot()
+
+    def _read(self, sock):
+        try:
+            for snapshot in subscribe_snapshots(sock):
+                self.callback({'kind': 'snapshot', 'snapshot': snapshot})
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        if self._sock is not None:  # Not stopped by us
+            self.callback({'kind': 'detached'})
+
+def serve():
+    setup_logging()
+    return SnapshotDaemon().serve_forever()
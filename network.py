@@ -1,99 +1,2162 @@
 """NetworkManager interface"""
+import array
+import collections
+import functools
+import importlib.util
+import json
+import logging
+import os
+import socket
 import subprocess
 import sys
+import threading
+import time
 
-try:
+# dbus and GLib are slow to import and only needed once the backend or the
+# monitor starts, so check for them here and import them on first use
+HAS_DBUS = importlib.util.find_spec("dbus") is not None
+HAS_GLIB = HAS_DBUS and importlib.util.find_spec("gi") is not None
+dbus = None  # bound by get_backend()
+
+NM_BUS = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_SETTINGS_PATH = "/org/freedesktop/NetworkManager/Settings"
+MM_BUS = "org.freedesktop.ModemManager1"
+MM_PATH = "/org/freedesktop/ModemManager1"
+PROPS_IFACE = "org.freedesktop.DBus.Properties"
+
+# D-Bus errors meaning our cached proxies point at a NetworkManager that
+# is gone (restarted, or the bus itself dropped); worth one reconnect
+STALE_BUS_ERRORS = {
+    'org.freedesktop.DBus.Error.ServiceUnknown',
+    'org.freedesktop.DBus.Error.NameHasNoOwner',
+    'org.freedesktop.DBus.Error.Disconnected',
+    'org.freedesktop.DBus.Error.UnknownObject',
+}
+
+# Object proxies kept per backend before the cache is dropped and refilled
+PROXY_CACHE_SIZE = 512
+
+# Radio switches on the NetworkManager object: (software, hardware) property
+RADIOS = {
+    'wifi': ('WirelessEnabled', 'WirelessHardwareEnabled'),
+    'wwan': ('WwanEnabled', 'WwanHardwareEnabled'),
+}
+
+# Where the last snapshot is kept so the next launch can paint it at once
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'gazelle')
+SNAPSHOT_CACHE = os.path.join(CACHE_DIR, 'snapshot.json')
+
+# Recent connection attempts with per-state timings, one JSON object per line
+CONNECT_LOG = os.path.join(CACHE_DIR, 'connect-times.jsonl')
+CONNECT_HISTORY = 50
+
+# Debug log, off unless GAZELLE_LOG names a level (debug, info, warning, error)
+STATE_DIR = os.path.join(os.environ.get('XDG_STATE_HOME') or os.path.expanduser('~/.local/state'), 'gazelle')
+LOG_FILE = os.path.join(STATE_DIR, 'gazelle.log')
+LOG_MAX_BYTES = 512 * 1024
+LOG_BACKUPS = 2
+# Records held in memory before a write; warnings and errors are written at once
+LOG_BUFFER = 64
+LOG_OFF = logging.CRITICAL + 1
+
+log = logging.getLogger('gazelle')
+log.addHandler(logging.NullHandler())  # never fall back to stderr under the TUI
+log.propagate = False
+log.setLevel(LOG_OFF)
+
+# NMDeviceType values mapped to the names nmcli prints in its TYPE column
+DEVICE_TYPES = {1: 'ethernet', 2: 'wifi', 8: 'gsm', 29: 'wireguard'}
+
+# Connection types of WiFi profiles (nmcli prints either name)
+WIFI_CONNECTION_TYPES = ('802-11-wireless', 'wifi')
+
+# Settings whose secrets GetSettings() leaves out; export asks for them separately
+SECRET_SETTINGS = ('802-11-wireless-security', '802-1x', 'vpn')
+# Properties nmcli prints as "key = value, ..." and as comma separated lists
+NMCLI_DICT_PROPERTIES = {'vpn.data', 'vpn.secrets'}
+NMCLI_LIST_PROPERTIES = {'802-1x.eap', '802-1x.phase2-autheap', '802-1x.altsubject-matches',
+                         'ipv4.addresses', 'ipv4.dns', 'ipv4.dns-search',
+                         'ipv6.addresses', 'ipv6.dns', 'ipv6.dns-search'}
+# key-mgmt values that authenticate with the 802-1x setting
+EAP_KEY_MGMT = ('wpa-eap', 'wpa-eap-suite-b-192', 'ieee8021x')
+# 802-1x properties holding a certificate or key; D-Bus carries them as file:// URIs
+CERT_PROPERTIES = {'ca-cert', 'client-cert', 'private-key',
+                   'phase2-ca-cert', 'phase2-client-cert', 'phase2-private-key'}
+IP_FAMILIES = {'ipv4': socket.AF_INET, 'ipv6': socket.AF_INET6}
+
+# Connection types NetworkManager uses for VPN profiles
+VPN_TYPES = ('vpn', 'wireguard', 'vpnc', 'pptp', 'openconnect', 'openvpn')
+
+# Columns requested from `nmcli device wifi list`
+WIFI_LIST_FIELDS = ['SSID', 'BSSID', 'SIGNAL', 'SECURITY', 'IN-USE', 'FREQ', 'CHAN', 'RATE', 'DEVICE']
+
+# Signal samples kept per BSSID, and how many BSSIDs are tracked at most
+SIGNAL_HISTORY = 60
+SIGNAL_HISTORY_BSSIDS = 256
+
+# Per-interface attributes and traffic counters, read without a subprocess
+SYSFS_NET = "/sys/class/net"
+LINK_COUNTERS = ('rx_bytes', 'tx_bytes', 'rx_errors', 'tx_errors', 'rx_dropped', 'tx_dropped')
+
+# Threads for the nmcli queries get_snapshot() runs side by side
+QUERY_WORKERS = 5
+
+# Seconds to wait for a requested scan, and how often to check on it
+SCAN_TIMEOUT = 15
+SCAN_POLL_INTERVAL = 0.1
+
+# NMActiveConnectionState
+ACTIVE_ACTIVATED = 2
+ACTIVE_DEACTIVATED = 4
+
+# Seconds a connect attempt may take before it is deactivated; the TUI
+# reads connect_timeout from config.json, `gazelle connect` has --timeout
+CONNECT_TIMEOUT = 90
+# Seconds between checks of a running activation for new states and cancel
+ACTIVATION_POLL = 0.1
+# nmcli is a process per check, so the fallback polls less often
+NMCLI_ACTIVATION_POLL = 0.5
+# nmcli's exit status when --wait runs out
+NMCLI_TIMEOUT_EXIT = 3
+
+# NMSettingsUpdate2Flags: keep a trial change in memory, write it once it works
+UPDATE2_TO_DISK = 0x1
+UPDATE2_IN_MEMORY = 0x2
+# Raised by NetworkManager releases older than Update2/AddAndActivateConnection2
+DBUS_UNKNOWN_METHOD = 'org.freedesktop.DBus.Error.UnknownMethod'
+
+# NMDeviceState and NMVpnConnectionState names used in connect timings;
+# config is association, need-auth is EAP/secrets, ip-config is DHCP
+DEVICE_STATES = {
+    10: 'unmanaged', 20: 'unavailable', 30: 'disconnected', 40: 'prepare',
+    50: 'config', 60: 'need-auth', 70: 'ip-config', 80: 'ip-check',
+    90: 'secondaries', 100: 'activated', 110: 'deactivating', 120: 'failed',
+}
+VPN_STATES = {
+    1: 'prepare', 2: 'need-auth', 3: 'connect', 4: 'ip-config',
+    5: 'activated', 6: 'failed', 7: 'disconnected',
+}
+
+# NM80211ApFlags / NM80211ApSecurityFlags
+AP_FLAGS_PRIVACY = 0x1
+AP_SEC_KEY_MGMT_PSK = 0x100
+AP_SEC_KEY_MGMT_802_1X = 0x200
+AP_SEC_KEY_MGMT_SAE = 0x400
+AP_SEC_KEY_MGMT_OWE = 0x800
+AP_SEC_KEY_MGMT_OWE_TM = 0x1000
+
+# MMModemAccessTechnology bits, highest generation first
+MM_ACCESS_TECH = [(1 << 15, '5GNR'), (1 << 14, 'LTE'), (1 << 9, 'HSPA+'), (1 << 8, 'HSPA'),
+                  (1 << 7, 'HSUPA'), (1 << 6, 'HSDPA'), (1 << 5, 'UMTS'), (1 << 4, 'EDGE'),
+                  (1 << 3, 'GPRS'), (1 << 1, 'GSM')]
+
+# MMModemState
+MM_STATES = {-1: 'failed', 0: 'unknown', 1: 'initializing', 2: 'locked', 3: 'disabled',
+             4: 'disabling', 5: 'enabling', 6: 'enabled', 7: 'searching', 8: 'registered',
+             9: 'disconnecting', 10: 'connecting', 11: 'connected'}
+
+def ap_security(flags, wpa_flags, rsn_flags):
+    """Build an nmcli-style SECURITY string from access point flags"""
+    parts = []
+    if flags & AP_FLAGS_PRIVACY and not wpa_flags and not rsn_flags:
+        parts.append('WEP')
+    if wpa_flags:
+        parts.append('WPA1')
+    if rsn_flags & (AP_SEC_KEY_MGMT_PSK | AP_SEC_KEY_MGMT_802_1X):
+        parts.append('WPA2')
+    if rsn_flags & AP_SEC_KEY_MGMT_SAE:
+        parts.append('WPA3')
+    if rsn_flags & (AP_SEC_KEY_MGMT_OWE | AP_SEC_KEY_MGMT_OWE_TM):
+        parts.append('OWE')
+    if (wpa_flags | rsn_flags) & AP_SEC_KEY_MGMT_802_1X:
+        parts.append('802.1X')
+    return ' '.join(parts)
+
+def frequency_to_channel(freq):
+    """Map a centre frequency in MHz to its 802.11 channel number"""
+    if freq == 2484:
+        return 14
+    if 2412 <= freq < 2484:
+        return (freq - 2407) // 5
+    if 5950 <= freq <= 7125:
+        return (freq - 5950) // 5
+    if 5000 <= freq < 5950:
+        return (freq - 5000) // 5
+    return 0
+
+def band_label(freq):
+    """Short band name for a frequency in MHz"""
+    if freq >= 5950:
+        return "6G"
+    if freq >= 5000:
+        return "5G"
+    return "2.4G" if freq else "-"
+
+class AccessPoint(collections.namedtuple('AccessPoint', (
+        'ssid', 'bssid', 'signal', 'security', 'connected', 'frequency', 'channel', 'rate',
+        'iface', 'path', 'security_class', 'aps'))):
+    """One BSSID as NetworkManager reports it (immutable)
+
+    signal is 0-100, frequency in MHz, rate in Mb/s; iface is the adapter
+    that sees it and path its D-Bus object path (None from nmcli).
+    security_class is security_label(security), worked out once here.
+    A network from group_networks() is its best AP with every BSSID of
+    the SSID in aps.
+    """
+    __slots__ = ()
+
+    def __new__(cls, ssid, bssid, signal, security, connected=False, frequency=0, channel=0,
+                rate=0, iface=None, path=None, security_class=None, aps=()):
+        if security_class is None:
+            security_class = security_label(security)
+        return super().__new__(cls, ssid, bssid, signal, security, connected, frequency,
+                               channel, rate, iface, path, security_class, aps)
+
+    @classmethod
+    def from_nmcli(cls, r):
+        """From a parsed `nmcli device wifi list` record (see WIFI_LIST_FIELDS)"""
+        return cls(r['ssid'], r['bssid'], r['signal'], r['security'], r['in_use'] == '*',
+                   r['freq'], r['chan'], r['rate'], r['device'])
+
+    def to_dict(self):
+        return dict(self._asdict(), aps=[ap.to_dict() for ap in self.aps])
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**dict(data, aps=tuple(cls.from_dict(ap) for ap in data.get('aps', ()))))
+
+class SavedConnection(collections.namedtuple('SavedConnection', (
+        'name', 'type', 'uuid', 'active', 'path', 'ssid'), defaults=(False, None, None))):
+    """A NetworkManager connection profile (immutable)
+
+    path is set over D-Bus; ssid for WiFi profiles read over D-Bus.
+    """
+    __slots__ = ()
+
+class VpnConnection(collections.namedtuple('VpnConnection', ('name', 'active', 'uuid'),
+                                           defaults=(None,))):
+    """A VPN profile and whether it is up"""
+    __slots__ = ()
+
+class ModemStatus(collections.namedtuple('ModemStatus', ('signal', 'operator', 'tech', 'state'))):
+    """What ModemManager reports for the first modem; signal is e.g. '48%'"""
+    __slots__ = ()
+
+def group_networks(aps):
+    """Group per-BSSID AccessPoints into one network per SSID
+
+    Each network is its best AP (the connected one, otherwise the
+    strongest) with every BSSID of the SSID, best first, in aps.
+    Hidden APs (empty SSID) are dropped. Networks are sorted by signal.
+    """
+    groups = {}
+    for ap in aps:
+        if ap.ssid:
+            groups.setdefault(ap.ssid, []).append(ap)
+    networks = []
+    for members in groups.values():
+        members.sort(key=lambda ap: (ap.connected, ap.signal), reverse=True)
+        networks.append(members[0]._replace(aps=tuple(members)))
+    return sorted(networks, key=lambda n: n.signal, reverse=True)
+
+class SignalHistory:
+    """Recent signal strengths per BSSID in fixed-size ring buffers
+
+    Each BSSID gets a byte array of `size` samples. At most `limit` BSSIDs
+    are kept; the one updated longest ago is dropped to make room, so
+    memory stays bounded however long gazelle runs.
+    """
+
+    def __init__(self, size=SIGNAL_HISTORY, limit=SIGNAL_HISTORY_BSSIDS):
+        self.size = size
+        self.limit = limit
+        self._rings = collections.OrderedDict()  # bssid -> [array('B'), next slot, count]
+
+    def add(self, bssid, signal):
+        entry = self._rings.get(bssid)
+        if entry is None:
+            if len(self._rings) >= self.limit:
+                self._rings.popitem(last=False)
+            entry = self._rings[bssid] = [array.array('B', bytes(self.size)), 0, 0]
+        else:
+            self._rings.move_to_end(bssid)
+        ring, slot, count = entry
+        ring[slot] = max(0, min(100, int(signal)))
+        entry[1] = (slot + 1) % self.size
+        entry[2] = min(count + 1, self.size)
+
+    def add_networks(self, networks):
+        """Record every AP of get_wifi_list()-style networks"""
+        for n in networks:
+            for ap in n.aps:
+                self.add(ap.bssid, ap.signal)
+
+    def samples(self, bssid):
+        """Signal samples for a BSSID, oldest first"""
+        entry = self._rings.get(bssid)
+        if entry is None:
+            return []
+        ring, slot, count = entry
+        return (ring[slot:] + ring[:slot])[-count:].tolist()
+
+def split_terse(line):
+    """Split an nmcli --terse line on unescaped colons, undoing \\: escapes"""
+    fields, field = [], []
+    chars = iter(line)
+    for c in chars:
+        if c == '\\':
+            field.append(next(chars, ''))
+        elif c == ':':
+            fields.append(''.join(field))
+            field = []
+        else:
+            field.append(c)
+    fields.append(''.join(field))
+    return fields
+
+# Converters for numeric nmcli fields; FREQ and RATE carry a unit ("5180 MHz")
+NMCLI_FIELD_TYPES = {
+    'signal': int,
+    'chan': int,
+    'freq': lambda v: int(v.split()[0]),
+    'rate': lambda v: int(v.split()[0]),
+}
+
+def parse_terse(lines, fields):
+    r"""Parse nmcli --terse --escape yes output into typed records
+
+    Streams over any iterable of lines (a list or a pipe) and yields one
+    dict per line, keyed by the lower-cased field name with '-' mapped to
+    '_'. Escaped colons and backslashes are restored and numeric fields
+    converted; lines with an unexpected field count are skipped.
+
+        >>> list(parse_terse(['my\\:net:70'], ['SSID', 'SIGNAL']))
+        [{'ssid': 'my:net', 'signal': 70}]
+    """
+    keys = [f.lower().replace('-', '_') for f in fields]
+    for line in lines:
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        values = split_terse(line)
+        if len(values) != len(keys):
+            continue
+        record = {}
+        for key, value in zip(keys, values):
+            convert = NMCLI_FIELD_TYPES.get(key)
+            if convert:
+                try:
+                    value = convert(value)
+                except (ValueError, IndexError):
+                    value = 0
+            record[key] = value
+        yield record
+
+_log_listener = None
+
+def setup_logging(level=None, path=LOG_FILE):
+    """Start writing the debug log if GAZELLE_LOG (or `level`) asks for it
+
+    Callers only put records on a queue; a listener thread formats them and
+    writes them in batches to a rotating file in the XDG state dir.
+    """
+    global _log_listener
+    level = (level or os.environ.get('GAZELLE_LOG') or "").upper()
+    if _log_listener is not None or not level:
+        return False
+    number = logging.getLevelName(level)  # getLevelNamesMapping() is Python 3.11+
+    if not isinstance(number, int):
+        return False
+    import atexit
+    import queue
+    from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        file_handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES,
+                                           backupCount=LOG_BACKUPS, encoding='utf-8')
+    except OSError:
+        return False
+    file_handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)-7s %(threadName)s %(message)s"))
+    buffered = MemoryHandler(LOG_BUFFER, flushLevel=logging.WARNING, target=file_handler)
+    records = queue.SimpleQueue()
+    _log_listener = QueueListener(records, buffered)
+    _log_listener.start()
+    log.handlers = [QueueHandler(records)]
+    log.setLevel(number)
+    atexit.register(stop_logging)
+    log.info("gazelle %s started, D-Bus %s", os.path.basename(sys.argv[0]),
+             "available" if HAS_DBUS else "unavailable")
+    return True
+
+def stop_logging():
+    """Write out buffered records and stop the listener thread"""
+    global _log_listener
+    if _log_listener is None:
+        return
+    log.setLevel(LOG_OFF)
+    _log_listener.stop()
+    for buffered in _log_listener.handlers:
+        file_handler = buffered.target
+        buffered.close()  # flushes what is still held in memory
+        file_handler.close()
+    _log_listener = None
+    log.handlers = [logging.NullHandler()]
+
+def log_duration(func):
+    """Log each call's outcome and duration at debug level
+
+    When debug logging is off the wrapper is a single level check.
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not log.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        outcome = "failed"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            log.debug("%s %s in %.1f ms", name, outcome, (time.perf_counter() - start) * 1000)
+    return wrapper
+
+def nmcli_records(fields, *args):
+    """Run an nmcli query in terse mode and return its parsed records"""
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(['nmcli', '-t', '--escape', 'yes', '-f', ','.join(fields), *args],
+                               capture_output=True, text=True, check=True)
+    finally:
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("nmcli %s in %.1f ms", " ".join(args), (time.perf_counter() - start) * 1000)
+    return list(parse_terse(result.stdout.splitlines(), fields))
+
+def decode_ssid(raw):
+    """Decode an SSID byte array as nmcli displays it"""
+    return bytes(bytearray(raw)).decode('utf-8', errors='replace')
+
+class ConnectTrace:
+    """Timeline of one connection attempt: when each activation state began"""
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.started = time.time()
+        self._t0 = time.monotonic()
+        self.steps = []  # [(state, seconds since start)]
+
+    def mark(self, state):
+        if not self.steps or self.steps[-1][0] != state:
+            self.steps.append((state, time.monotonic() - self._t0))
+
+    def to_dict(self, ok, message=""):
+        total = time.monotonic() - self._t0
+        ends = [t for _, t in self.steps[1:]] + [total]
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'started': self.started,
+            'ok': bool(ok),
+            'message': str(message or "").strip(),
+            'total': round(total, 3),
+            'phases': [{'state': state, 'start': round(t, 3), 'duration': round(end - t, 3)}
+                       for (state, t), end in zip(self.steps, ends)],
+        }
+
+class ConnectJob:
+    """A connect call run as a tracked activation job
+
+    run(func, *args) calls one of the connect_* functions on the current
+    thread. Every state the activation reaches (see trace_step) goes to
+    on_state as it happens, activation is given up after `timeout`
+    seconds, and cancel() from any other thread makes the waiting code
+    deactivate the connection and return.
+    """
+
+    def __init__(self, timeout=CONNECT_TIMEOUT, on_state=None, label=""):
+        self.timeout = timeout
+        self.on_state = on_state
+        self.label = label
+        self.state = None
+        self.outcome = None  # 'cancelled' or 'timeout' when it ended early
+        self.done = False
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def step(self, state):
+        if state != self.state:
+            self.state = state
+            if state in ('cancelled', 'timeout'):
+                self.outcome = state
+            if self.on_state:
+                self.on_state(state)
+
+    def run(self, func, *args):
+        _trace.job = self
+        try:
+            result = func(*args)
+        finally:
+            _trace.job = None
+            self.done = True
+        if self.outcome == 'cancelled':
+            return False, "Cancelled"
+        if self.outcome == 'timeout':
+            return False, f"Timed out after {self.timeout:g} s"
+        return result
+
+_trace = threading.local()
+
+def current_job():
+    """The ConnectJob running on this thread, or None"""
+    return getattr(_trace, 'job', None)
+
+def trace_step(state):
+    """Note that the connect attempt on this thread has reached a state"""
+    trace = getattr(_trace, 'current', None)
+    if trace is not None:
+        trace.mark(state)
+    job = getattr(_trace, 'job', None)
+    if job is not None:
+        job.step(state)
+
+def load_connect_log(path=CONNECT_LOG):
+    """Recent connection timelines, oldest first (see ConnectTrace.to_dict)"""
+    entries = collections.deque(maxlen=CONNECT_HISTORY)
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return list(entries)
+
+_connect_log_lock = threading.Lock()
+
+def record_connect(entry, path=CONNECT_LOG):
+    """Append a timeline to the connect log, keeping the last CONNECT_HISTORY"""
+    with _connect_log_lock:
+        entries = load_connect_log(path)[-(CONNECT_HISTORY - 1):] + [entry]
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                f.writelines(json.dumps(e, separators=(',', ':')) + "\n" for e in entries)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+def timed_connect(kind):
+    """Record how long a connect function spends in each activation state"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(name, *args, **kwargs):
+            trace = _trace.current = ConnectTrace(profile_label(name), kind)
+            trace.mark('lookup')
+            result = (False, "")
+            try:
+                result = func(name, *args, **kwargs)
+                return result
+            except Exception as e:
+                result = (False, str(e))
+                raise
+            finally:
+                _trace.current = None
+                ok, message = result if isinstance(result, tuple) else (result, "")
+                entry = trace.to_dict(ok, message)
+                log.info("connect %s %r %s in %.2f s", kind, trace.name,
+                         "succeeded" if ok else "failed", entry['total'])
+                record_connect(entry)
+        return wrapper
+    return decorate
+
+class NetworkSnapshot:
+    """Point-in-time view of devices, radios, access points and connections
+
+    Built by get_snapshot() from one set of queries so every table renders
+    from the same data.
+    """
+
+    FIELDS = ('devices', 'wifi_enabled', 'wwan_enabled', 'networks', 'connections', 'active')
+
+    def __init__(self, devices, wifi_enabled, wwan_enabled, networks, connections, active,
+                 taken_at=None):
+        self.devices = devices          # [{'iface', 'type', 'hwaddr', ...}]
+        self.wifi_enabled = wifi_enabled
+        self.wwan_enabled = wwan_enabled
+        self.networks = networks        # get_wifi_list() AccessPoints
+        self.connections = connections  # every SavedConnection
+        self.active = active            # the SavedConnections that are up
+        self.taken_at = time.time() if taken_at is None else taken_at
+        self._ssids = None  # see _ssid_index()
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data['networks'] = [n.to_dict() for n in self.networks]
+        data['connections'] = [c._asdict() for c in self.connections]
+        data['active'] = [c._asdict() for c in self.active]
+        data['taken_at'] = self.taken_at
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data,
+                    networks=[AccessPoint.from_dict(n) for n in data['networks']],
+                    connections=[SavedConnection(**c) for c in data['connections']],
+                    active=[SavedConnection(**c) for c in data['active']])
+        return cls(*(data[field] for field in cls.FIELDS), taken_at=data['taken_at'])
+
+    def interface(self, dev_type):
+        """Return the first interface of a given nmcli type, or None"""
+        for dev in self.devices:
+            if dev['type'] == dev_type:
+                return dev['iface']
+        return None
+
+    def interfaces(self, dev_type):
+        """Return every interface of a given nmcli type"""
+        return [dev['iface'] for dev in self.devices if dev['type'] == dev_type]
+
+    @property
+    def wifi_interface(self):
+        return self.interface('wifi') or 'wlan0'
+
+    def hwaddr(self, iface):
+        for dev in self.devices:
+            if dev['iface'] == iface and dev.get('hwaddr'):
+                return dev['hwaddr']
+        return '-'
+
+    def station_info(self):
+        """Station status in the same shape as get_station_info()"""
+        info = {'state': 'connected' if self.active else 'disconnected',
+                'scanning': 'false', 'frequency': '-', 'security': '-'}
+        if self.active:
+            for n in self.networks:
+                if n.connected:
+                    if n.frequency:
+                        info['frequency'] = f"{n.frequency} MHz"
+                    info['security'] = n.security or '-'
+                    break
+        return info
+
+    def _ssid_index(self):
+        """{ssid: (rank, SavedConnection)} of the WiFi profiles, built once"""
+        if self._ssids is None:
+            ssids = {}
+            for rank, c in enumerate(self.connections):
+                if c.type in WIFI_CONNECTION_TYPES:
+                    ssids.setdefault(c.ssid or c.name, (rank, c))
+            self._ssids = ssids
+        return self._ssids
+
+    def profile_for(self, ssid):
+        """The saved profile NetworkManager would use for an SSID, or None"""
+        entry = self._ssid_index().get(ssid)
+        return entry[1] if entry else None
+
+    def known_networks(self):
+        """In-range networks with a saved profile, in profile order"""
+        ssids = self._ssid_index()
+        return sorted((n for n in self.networks if n.ssid in ssids), key=lambda n: ssids[n.ssid][0])
+
+    def new_networks(self):
+        """In-range networks without a saved profile"""
+        ssids = self._ssid_index()
+        return [n for n in self.networks if n.ssid not in ssids]
+
+def open_bus(**kwargs):
+    """Connect to the bus NetworkManager is on
+
+    GAZELLE_BUS=session talks to a stand-in on the session bus instead,
+    such as the one the benchmarks start.
+    """
     import dbus
-    HAS_DBUS = True
-except ImportError:
-    HAS_DBUS = False
+    if os.environ.get('GAZELLE_BUS') == 'session':
+        return dbus.SessionBus(**kwargs)
+    return dbus.SystemBus(**kwargs)
+
+def reconnecting(method):
+    """Retry a backend call once on a fresh connection if NetworkManager went away
+
+    Proxies bind to NetworkManager's unique bus name, so after a restart
+    every cached proxy fails with ServiceUnknown. Calls that fail that way
+    drop the cache and run again against the new instance. Every call is
+    also timed for the debug log.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except dbus.DBusException as e:
+            if e.get_dbus_name() not in STALE_BUS_ERRORS:
+                raise
+            log.info("%s: %s, reconnecting", method.__name__, e.get_dbus_name())
+            self.reconnect()
+            return method(self, *args, **kwargs)
+    return log_duration(wrapper)
+
+class NetworkManagerBackend:
+    """NetworkManager access over a single long-lived system bus connection
+
+    Object proxies are cached per (bus name, path), so repeated calls
+    skip the name lookup that get_object() does for each new proxy.
+    """
+
+    def __init__(self):
+        self.bus = open_bus()
+        self._proxies = {}
+
+    def reconnect(self):
+        """Forget cached proxies and reopen the bus if it was closed
+
+        Device and profile paths belong to the old instance too, so both
+        registries are dropped. Their loaders run without their locks held,
+        so this is safe from inside one.
+        """
+        self._proxies = {}
+        if not self.bus.get_is_connected():
+            self.bus = open_bus(private=True)
+        DEVICES.invalidate()
+        CONNECTIONS.invalidate()
+
+    def _obj(self, path, bus_name=NM_BUS):
+        key = (bus_name, str(path))
+        proxy = self._proxies.get(key)
+        if proxy is None:
+            if len(self._proxies) >= PROXY_CACHE_SIZE:
+                self._proxies = {}  # access point paths churn; don't grow forever
+            proxy = self._proxies[key] = self.bus.get_object(bus_name, path, introspect=False)
+        return proxy
+
+    def _iface(self, path, iface, bus_name=NM_BUS):
+        return dbus.Interface(self._obj(path, bus_name), iface)
+
+    def _props(self, path, iface, bus_name=NM_BUS):
+        """Fetch all properties of an interface in one round-trip"""
+        return self._iface(path, PROPS_IFACE, bus_name).GetAll(iface)
+
+    def _get(self, path, iface, name):
+        return self._iface(path, PROPS_IFACE).Get(iface, name)
+
+    # Devices
+
+    @reconnecting
+    def enumerate_devices(self):
+        """List devices as dicts with iface, type and path (see DEVICES)"""
+        devices = []
+        for path in self._iface(NM_PATH, NM_BUS).GetDevices():
+            props = self._props(path, NM_BUS + ".Device")
+            devices.append({
+                'iface': str(props['Interface']),
+                'type': DEVICE_TYPES.get(int(props['DeviceType']), 'other'),
+                'path': path,
+            })
+        return devices
+
+    def find_device(self, dev_type):
+        """Return the first device of a given nmcli type, or None"""
+        return DEVICES.first(dev_type)
+
+    # Access points
+
+    def _ap_info(self, ap_path, iface=None, connected=False):
+        props = self._props(ap_path, NM_BUS + ".AccessPoint")
+        frequency = int(props['Frequency'])
+        return AccessPoint(
+            ssid=decode_ssid(props['Ssid']),
+            bssid=str(props['HwAddress']),
+            signal=int(props['Strength']),
+            security=ap_security(int(props['Flags']), int(props['WpaFlags']),
+                                 int(props['RsnFlags'])),
+            connected=connected,
+            frequency=frequency,
+            channel=frequency_to_channel(frequency),
+            rate=int(props['MaxBitrate']) // 1000,
+            iface=iface,
+            path=ap_path,
+        )
+
+    def get_access_points(self):
+        """List the AccessPoints seen by every WiFi adapter"""
+        wireless = NM_BUS + ".Device.Wireless"
+        aps = []
+        for dev in DEVICES.by_type('wifi'):
+            active_ap = self._get(dev['path'], wireless, 'ActiveAccessPoint')
+            for ap_path in self._iface(dev['path'], wireless).GetAllAccessPoints():
+                aps.append(self._ap_info(ap_path, dev['iface'], ap_path == active_ap))
+        return aps
+
+    @reconnecting
+    def get_wifi_list(self):
+        """Get available WiFi networks grouped per SSID, see group_networks()"""
+        return group_networks(self.get_access_points())
+
+    def find_ap(self, ssid):
+        """Return (device, AccessPoint) of the strongest AP advertising ssid
+
+        With several adapters this picks the one that hears the SSID best.
+        Returns (None, None) when no adapter sees it.
+        """
+        best = None
+        for ap in self.get_access_points():
+            if ap.ssid == ssid and (best is None or ap.signal > best.signal):
+                best = ap
+        if best is None:
+            return None, None
+        return next(dev for dev in DEVICES.by_type('wifi') if dev['iface'] == best.iface), best
+
+    # Connections
+
+    @reconnecting
+    def get_active_connections(self):
+        """List active connections as dicts with name, type, uuid and path"""
+        active = []
+        for path in self._get(NM_PATH, NM_BUS, 'ActiveConnections'):
+            try:
+                props = self._props(path, NM_BUS + ".Connection.Active")
+            except dbus.DBusException:
+                continue  # Deactivated between listing and reading
+            active.append({
+                'name': str(props['Id']),
+                'type': str(props['Type']),
+                'uuid': str(props['Uuid']),
+                'path': path,
+                'connection': props['Connection'],
+            })
+        return active
+
+    @reconnecting
+    def get_connection(self, path):
+        """Read one saved profile as a SavedConnection (active is left False)"""
+        settings = self._iface(path, NM_BUS + ".Settings.Connection").GetSettings()
+        con = settings.get('connection', {})
+        wireless = settings.get('802-11-wireless', {})
+        return SavedConnection(
+            name=str(con.get('id', '')),
+            type=str(con.get('type', '')),
+            uuid=str(con.get('uuid', '')),
+            path=str(path),
+            ssid=decode_ssid(wireless['ssid']) if 'ssid' in wireless else None,
+        )
+
+    @reconnecting
+    def get_connections(self):
+        """List saved profiles as SavedConnections (see CONNECTIONS)"""
+        settings = self._iface(NM_SETTINGS_PATH, NM_BUS + ".Settings")
+        return [self.get_connection(path) for path in settings.ListConnections()]
+
+    @reconnecting
+    def get_active_uuids(self):
+        return {ac['uuid'] for ac in self.get_active_connections()}
+
+    def connection_path(self, uuid):
+        """Object path of the saved profile with this UUID"""
+        return self._iface(NM_SETTINGS_PATH, NM_BUS + ".Settings").GetConnectionByUuid(uuid)
+
+    def delete_profiles(self, profiles):
+        for profile in profiles:
+            self.delete_connection(self.connection_path(profile.uuid))
+            CONNECTIONS.discard(profile.uuid)
+
+    @reconnecting
+    def get_current_connection(self):
+        active = self.get_active_connections()
+        return active[0]['name'] if active else None
+
+    @reconnecting
+    def get_station_info(self):
+        current = self.get_current_connection()
+        info = {'state': 'connected' if current else 'disconnected',
+                'scanning': 'false', 'frequency': '-', 'security': '-'}
+        if not current:
+            return info
+        for dev in DEVICES.by_type('wifi'):
+            ap_path = self._get(dev['path'], NM_BUS + ".Device.Wireless", 'ActiveAccessPoint')
+            if ap_path != "/":
+                ap = self._ap_info(ap_path)
+                info['frequency'] = f"{ap.frequency} MHz"
+                info['security'] = ap.security or '-'
+                break
+        return info
+
+    def wait_for_activation(self, active_path, timeout=None):
+        """Poll an active connection until it activates or fails
+
+        Each poll also notes the device (or VPN) state for trace_step(), so
+        connect timings show association, authentication and DHCP apart.
+        A cancelled ConnectJob or the timeout (the job's, else
+        CONNECT_TIMEOUT) deactivates the connection.
+        """
+        job = current_job()
+        if timeout is None:
+            timeout = job.timeout if job else CONNECT_TIMEOUT
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if job and job.cancelled:
+                trace_step('cancelled')
+                self.deactivate(active_path)
+                return False
+            try:
+                active = self._props(active_path, NM_BUS + ".Connection.Active")
+                self._trace_state(active_path, active)
+            except dbus.DBusException:
+                trace_step('failed')
+                return False  # NM removed the active connection: activation failed
+            state = int(active['State'])
+            if state == ACTIVE_ACTIVATED:
+                trace_step('activated')
+                return True
+            if state == ACTIVE_DEACTIVATED:
+                trace_step('failed')
+                return False
+            time.sleep(ACTIVATION_POLL)
+        trace_step('timeout')
+        self.deactivate(active_path)
+        return False
+
+    def deactivate(self, active_path):
+        """DeactivateConnection, ignoring an activation that already ended"""
+        try:
+            self._iface(NM_PATH, NM_BUS).DeactivateConnection(active_path, signature='o')
+        except dbus.DBusException:
+            pass
+
+    def _trace_state(self, active_path, active):
+        if active.get('Vpn'):
+            state = self._get(active_path, NM_BUS + ".VPN.Connection", 'VpnState')
+            trace_step(VPN_STATES.get(int(state), 'unknown'))
+        elif active.get('Devices'):
+            state = self._get(active['Devices'][0], NM_BUS + ".Device", 'State')
+            trace_step(DEVICE_STATES.get(int(state), 'unknown'))
+
+    def activate(self, con_path, dev_path="/"):
+        """Activate a saved profile and wait for the result"""
+        trace_step('activate')
+        nm = self._iface(NM_PATH, NM_BUS)
+        active = nm.ActivateConnection(con_path, dev_path, "/", signature='ooo')
+        return self.wait_for_activation(active)
+
+    def delete_connection(self, con_path):
+        self._iface(con_path, NM_BUS + ".Settings.Connection").Delete()
+
+    @reconnecting
+    def add_connections(self, batch):
+        """Save profiles over this one bus connection without activating them"""
+        settings_iface = self._iface(NM_SETTINGS_PATH, NM_BUS + ".Settings")
+        results = []
+        for settings in batch:
+            try:
+                stale = replaced_profiles(settings)
+                uuid = settings['connection'].get('uuid')
+                if uuid and stale:
+                    # Same UUID: NetworkManager checks the new settings before replacing the old
+                    self.update_profile(self.connection_path(uuid), dbus_settings(settings),
+                                        UPDATE2_TO_DISK)
+                else:
+                    con_path = settings_iface.AddConnection(dbus_settings(settings),
+                                                            signature='a{sa{sv}}')
+                    uuid = str(self.get_connection(con_path).uuid)
+                    self.delete_profiles(stale)  # Only once the new profile is saved
+                results.append((True, uuid))
+            except dbus.DBusException as e:
+                results.append((False, e.get_dbus_message()))
+        return results
+
+    @reconnecting
+    def get_connection_settings(self, secrets=False):
+        """Every saved profile's settings as plain dicts, with secrets if asked"""
+        settings_iface = self._iface(NM_SETTINGS_PATH, NM_BUS + ".Settings")
+        profiles = []
+        for path in settings_iface.ListConnections():
+            try:
+                settings = self.read_settings(path, secrets)
+            except dbus.DBusException:
+                settings = self.read_settings(path)  # No agent or not allowed; export without them
+            profiles.append(text_settings(plain_dbus(settings)))
+        return profiles
+
+    @reconnecting
+    def connect_wifi(self, ssid, password, hidden=False):
+        if hidden:
+            dev, ap = self.find_device('wifi'), None
+            if not dev:
+                return False, "No WiFi interface found"
+        else:
+            dev, ap = self.find_ap(ssid)
+            if not dev:
+                return False, f"No network with SSID '{ssid}' found."
+        settings = {
+            'connection': {'id': ssid, 'type': '802-11-wireless'},
+            '802-11-wireless': {'ssid': dbus.ByteArray(ssid.encode())},
+        }
+        if hidden:
+            settings['802-11-wireless']['hidden'] = True
+        if password:
+            settings['802-11-wireless-security'] = wifi_security(ap.security if ap else "", password)
+        return self.trial_connect(settings, dev['path'], ap.path if ap else "/",
+                                  CONNECTIONS.for_ssid(ssid))
+
+    def read_settings(self, con_path, secrets=False):
+        """GetSettings() of a profile, with its secrets merged in when asked
+
+        Raises if a secret setting cannot be read, so a caller that needs
+        the complete profile (to restore it) never gets a partial one.
+        """
+        con = self._iface(con_path, NM_BUS + ".Settings.Connection")
+        settings = con.GetSettings()
+        for name in SECRET_SETTINGS if secrets else ():
+            if name in settings:
+                settings[name].update(con.GetSecrets(name).get(name, {}))
+        return settings
+
+    def update_profile(self, con_path, settings, flags):
+        self._iface(con_path, NM_BUS + ".Settings.Connection").Update2(
+            settings, dbus.UInt32(flags), {}, signature='a{sa{sv}}ua{sv}')
+
+    def trial_connect(self, settings, dev_path, ap_path, saved):
+        """Activate settings without writing anything until activation succeeds
+
+        A saved profile for the same network (the first of `saved`) is
+        updated in memory only and activated in place; success writes it to
+        disk, failure puts its previous settings back, so a mistyped password
+        never costs a working profile. Without one, or when its secrets
+        cannot be read to restore it, a volatile profile is added instead:
+        NetworkManager drops it by itself if activation fails, and it is made
+        persistent (replacing `saved`) once it is up.
+        """
+        if saved:
+            try:
+                con_path = self.connection_path(saved[0].uuid)
+                restore = self.read_settings(con_path, secrets=True)
+                trial = merge_settings(restore, settings)
+                trace_step('update-profile')
+                self.update_profile(con_path, trial, UPDATE2_IN_MEMORY)
+            except dbus.DBusException as e:
+                log.info("cannot update %s in place, adding a new profile: %s",
+                         saved[0].name, e.get_dbus_message())
+            else:
+                return self._commit_or_restore(con_path, dev_path, trial, restore)
+        try:
+            ok, message = self._trial_add(settings, dev_path, ap_path)
+        except dbus.DBusException as e:
+            if e.get_dbus_name() != DBUS_UNKNOWN_METHOD:
+                raise
+            ok, message = self.add_and_activate(settings, dev_path, ap_path)
+        if ok:
+            self.delete_profiles(saved)
+        return ok, message
+
+    def _commit_or_restore(self, con_path, dev_path, trial, restore):
+        """Activate the in-memory trial, then save it or put `restore` back
+
+        Errors are returned rather than raised: the profile has been touched,
+        so the caller must not go on to try nmcli over it.
+        """
+        saved = False
+        try:
+            if not self.activate(con_path, dev_path):
+                return False, "Activation failed"
+            trace_step('save')
+            self.update_profile(con_path, trial, UPDATE2_TO_DISK)
+            saved = True
+            return True, "Connected"
+        except Exception as e:
+            log.warning("trial of %s failed: %s", con_path, e)
+            return False, f"Activation failed: {e}"
+        finally:
+            if not saved:
+                trace_step('rollback')
+                try:
+                    self.update_profile(con_path, restore, UPDATE2_TO_DISK)
+                except dbus.DBusException as e:
+                    log.warning("cannot restore %s: %s", con_path, e.get_dbus_message())
+
+    def _trial_add(self, settings, dev_path, ap_path):
+        trace_step('add-profile')
+        nm = self._iface(NM_PATH, NM_BUS)
+        con_path, active, _ = nm.AddAndActivateConnection2(
+            settings, dev_path, ap_path, {'persist': 'volatile'}, signature='a{sa{sv}}ooa{sv}')
+        if self.wait_for_activation(active):
+            trace_step('save')
+            self.update_profile(con_path, merge_settings(self.read_settings(con_path), settings),
+                                UPDATE2_TO_DISK)
+            return True, "Connected"
+        try:
+            self.delete_connection(con_path)
+        except dbus.DBusException:
+            pass  # Already gone with the failed activation
+        return False, "Activation failed"
+
+    def add_and_activate(self, settings, dev_path, ap_path="/"):
+        """Add a profile, activate it, and remove it again if activation fails
+
+        For NetworkManager before 1.16, which has no volatile profiles.
+        """
+        trace_step('add-profile')
+        nm = self._iface(NM_PATH, NM_BUS)
+        con_path, active = nm.AddAndActivateConnection(settings, dev_path, ap_path,
+                                                       signature='a{sa{sv}}oo')
+        if self.wait_for_activation(active):
+            return True, "Connected"
+        self.delete_connection(con_path)
+        return False, "Activation failed"
+
+    @reconnecting
+    def connect_802_1x(self, ssid, username, password, eap_method="peap",
+                       phase2_auth="mschapv2", hidden=False):
+        dev = self.find_ap(ssid)[0] or self.find_device('wifi')
+        if not dev:
+            return False, "No WiFi interface found"
+        settings = {
+            'connection': {'id': ssid, 'type': '802-11-wireless', 'interface-name': dev['iface']},
+            '802-11-wireless': {'ssid': dbus.ByteArray(ssid.encode())},
+            '802-11-wireless-security': {'key-mgmt': 'wpa-eap'},
+            '802-1x': eap_settings(username, password, eap_method, phase2_auth),
+        }
+        if hidden:
+            settings['802-11-wireless']['hidden'] = True
+        return self.trial_connect(settings, dev['path'], "/", CONNECTIONS.for_ssid(ssid))
+
+    @reconnecting
+    def connect_802_1x_wired(self, con_name, username, password, eap_method="peap",
+                             phase2_auth="mschapv2"):
+        dev = self.find_device('ethernet')
+        if not dev:
+            return False, "No Ethernet interface found"
+        settings = {
+            'connection': {'id': con_name, 'type': '802-3-ethernet', 'interface-name': dev['iface']},
+            '802-3-ethernet': {},
+            '802-1x': eap_settings(username, password, eap_method, phase2_auth),
+        }
+        saved = [p for p in CONNECTIONS.lookup(con_name) if p.type == '802-3-ethernet']
+        return self.trial_connect(settings, dev['path'], "/", saved)
+
+    @reconnecting
+    def connection_up(self, uuid):
+        """Activate a saved profile by UUID (nmcli connection up uuid)"""
+        if self.activate(self.connection_path(uuid)):
+            return True, "Connected"
+        return False, "Activation failed"
+
+    @reconnecting
+    def scan(self, cancelled, timeout):
+        """Request a scan on every WiFi adapter and wait for their LastScan to advance"""
+        wireless = NM_BUS + ".Device.Wireless"
+        pending = {}
+        for dev in DEVICES.by_type('wifi'):
+            pending[dev['path']] = int(self._get(dev['path'], wireless, 'LastScan'))
+            try:
+                self._iface(dev['path'], wireless).RequestScan({}, signature='a{sv}')
+            except dbus.DBusException as e:
+                # NotAllowed while a scan is already running: wait for that one
+                if not e.get_dbus_name().endswith('.NotAllowed'):
+                    raise
+        if not pending:
+            return False
+        deadline = time.monotonic() + timeout
+        while not cancelled() and time.monotonic() < deadline:
+            for path, before in list(pending.items()):
+                if int(self._get(path, wireless, 'LastScan')) != before:
+                    del pending[path]
+            if not pending:
+                return True
+            time.sleep(SCAN_POLL_INTERVAL)
+        return False
+
+    @reconnecting
+    def connection_down(self, uuid):
+        """Deactivate an active connection by UUID (nmcli connection down uuid)"""
+        for ac in self.get_active_connections():
+            if ac['uuid'] == uuid:
+                self._iface(NM_PATH, NM_BUS).DeactivateConnection(ac['path'])
+                return True
+        return False
+
+    @reconnecting
+    def forget(self, profiles):
+        self.delete_profiles(profiles)
+        return bool(profiles)
+
+    @reconnecting
+    def disconnect_device(self, dev_type):
+        """Disconnect every connected device of a type; False if none was"""
+        disconnected = False
+        for dev in DEVICES.by_type(dev_type):
+            if self._get(dev['path'], NM_BUS + ".Device", 'ActiveConnection') != "/":
+                self._iface(dev['path'], NM_BUS + ".Device").Disconnect()
+                disconnected = True
+        return disconnected
+
+    @reconnecting
+    def get_active_of_types(self, types):
+        for ac in self.get_active_connections():
+            if ac['type'] in types:
+                return ac['name']
+        return None
+
+    @reconnecting
+    def get_snapshot(self):
+        """Gather devices, radios, access points and connections in one pass"""
+        radios = self.radios()
+        active = self.get_active_uuids()
+        connections = [c._replace(active=c.uuid in active) for c in CONNECTIONS.profiles()]
+        return NetworkSnapshot(
+            devices=[dict(dev, hwaddr=sysfs_hwaddr(dev['iface'])) for dev in DEVICES.devices()],
+            wifi_enabled=radios['wifi'],
+            wwan_enabled=radios['wwan'],
+            networks=self.get_wifi_list(),
+            connections=connections,
+            active=[c for c in connections if c.active],
+        )
+
+    # Radios
+
+    @reconnecting
+    def radios(self):
+        """Effective state of every radio switch from a single GetAll"""
+        nm = self._props(NM_PATH, NM_BUS)
+        return {radio: bool(nm[sw]) and bool(nm[hw]) for radio, (sw, hw) in RADIOS.items()}
+
+    @reconnecting
+    def toggle_radio(self, radio):
+        """Flip a radio's software switch and return the new setting"""
+        prop = RADIOS[radio][0]
+        enabled = not bool(self._get(NM_PATH, NM_BUS, prop))
+        self._iface(NM_PATH, PROPS_IFACE).Set(NM_BUS, prop, enabled)
+        return enabled
+
+    # ModemManager
+
+    @reconnecting
+    def get_modem_info(self):
+        manager = self._iface(MM_PATH, "org.freedesktop.DBus.ObjectManager", MM_BUS)
+        for path, ifaces in manager.GetManagedObjects().items():
+            modem = ifaces.get(MM_BUS + ".Modem")
+            if modem is None:
+                continue
+            quality = modem.get('SignalQuality', (0, False))[0]
+            access = int(modem.get('AccessTechnologies', 0))
+            tech = next((name for bit, name in MM_ACCESS_TECH if access & bit), '-')
+            operator = ifaces.get(MM_BUS + ".Modem.Modem3gpp", {}).get('OperatorName', '')
+            return ModemStatus(
+                signal=f"{int(quality)}%",
+                operator=str(operator) or '-',
+                tech=tech,
+                state=MM_STATES.get(int(modem.get('State', 0)), 'unknown'),
+            )
+        return None
+
+class DeviceRegistry:
+    """Enumerate network devices once and cache them by type
+
+    Interfaces rarely change during a session, so the device list is only
+    reloaded after invalidate(), which NetworkMonitor calls when
+    NetworkManager reports DeviceAdded or DeviceRemoved. The loader returns
+    a list of {'iface', 'type', ...} dicts, or None if enumeration failed
+    (failures are not cached). The loader runs without the lock held, as
+    a backend call that reconnects invalidates the registry itself.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._devices = None
+        self._generation = 0  # Bumped by invalidate(), so a stale load is not kept
+
+    def devices(self):
+        with self._lock:
+            devices, generation = self._devices, self._generation
+        if devices is None:
+            devices = self._loader()
+            with self._lock:
+                if devices is not None and self._generation == generation:
+                    self._devices = devices
+        return list(devices or [])
+
+    def by_type(self, dev_type):
+        """Every device of a given nmcli type, e.g. all WiFi adapters"""
+        return [dev for dev in self.devices() if dev['type'] == dev_type]
+
+    def first(self, dev_type):
+        devices = self.by_type(dev_type)
+        return devices[0] if devices else None
+
+    def invalidate(self):
+        with self._lock:
+            self._devices = None
+            self._generation += 1
+
+def _load_devices():
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.enumerate_devices()
+        except Exception:
+            pass
+
+    try:
+        return [{'iface': dev['device'], 'type': dev['type']}
+                for dev in nmcli_records(['DEVICE', 'TYPE'], 'device')]
+    except:
+        return None
+
+DEVICES = DeviceRegistry(_load_devices)
+
+class ConnectionIndex:
+    """Saved profiles indexed by UUID and by SSID
+
+    Loaded once, then kept current from NetworkManager's Settings signals:
+    NetworkMonitor re-reads a profile on NewConnection or Updated and drops
+    it on ConnectionRemoved. The nmcli monitor has no per-profile events,
+    so it invalidates the index instead. Profiles are held with active
+    False; snapshots set the flag from the active UUIDs.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.Lock()
+        # Both maps are replaced, never changed in place, so callers can use them unlocked
+        self._by_uuid = None  # uuid -> SavedConnection, in NetworkManager's order
+        self._by_ssid = {}  # ssid -> [SavedConnection]
+        self._generation = 0  # Bumped on every change, so a stale load is not kept
+
+    def _load(self):
+        """(by_uuid, by_ssid), loading them first if needed
+
+        The loader runs without the lock held: a backend call that
+        reconnects invalidates the index itself.
+        """
+        with self._lock:
+            if self._by_uuid is not None:
+                return self._by_uuid, self._by_ssid
+            generation = self._generation
+        profiles = self._loader()
+        if profiles is None:
+            return {}, {}  # Failures are not cached
+        by_uuid = {p.uuid: p for p in profiles}
+        by_ssid = ssid_index(by_uuid)
+        with self._lock:
+            if self._generation == generation:
+                self._by_uuid, self._by_ssid = by_uuid, by_ssid
+        return by_uuid, by_ssid
+
+    def _replace(self, by_uuid):
+        """Swap in a changed uuid map; call with the lock held"""
+        self._by_uuid, self._by_ssid = by_uuid, ssid_index(by_uuid)
+        self._generation += 1
+
+    def profiles(self):
+        return list(self._load()[0].values())
+
+    def get(self, uuid):
+        return self._load()[0].get(uuid)
+
+    def for_ssid(self, ssid):
+        """Every profile for an SSID, in NetworkManager's order"""
+        return list(self._load()[1].get(ssid, ()))
+
+    def lookup(self, key):
+        """Profiles matching a UUID, else an SSID, else a name
+
+        An index that misses is reloaded once, in case the profile was
+        added by a process whose signals this one did not see.
+        """
+        for reload in (False, True):
+            if reload:
+                self.invalidate()
+            by_uuid, by_ssid = self._load()
+            if key in by_uuid:
+                return [by_uuid[key]]
+            found = by_ssid.get(key) or [p for p in by_uuid.values() if p.name == key]
+            if found:
+                return list(found)
+        return []
+
+    def put(self, profile):
+        """Add or replace a profile (NewConnection, Updated)"""
+        with self._lock:
+            if self._by_uuid is not None:
+                self._replace({**self._by_uuid, profile.uuid: profile})
+
+    def discard(self, uuid):
+        with self._lock:
+            if self._by_uuid is not None and uuid in self._by_uuid:
+                self._replace({u: p for u, p in self._by_uuid.items() if u != uuid})
+
+    def discard_path(self, path):
+        """Drop the profile at a D-Bus object path (ConnectionRemoved)"""
+        with self._lock:
+            if self._by_uuid is not None and any(p.path == path for p in self._by_uuid.values()):
+                self._replace({u: p for u, p in self._by_uuid.items() if p.path != path})
+
+    def invalidate(self):
+        with self._lock:
+            self._by_uuid = None
+            self._by_ssid = {}
+            self._generation += 1
+
+def ssid_index(by_uuid):
+    """ssid -> [SavedConnection] for the WiFi profiles in a uuid map"""
+    by_ssid = {}
+    for profile in by_uuid.values():
+        if profile.ssid:
+            by_ssid.setdefault(profile.ssid, []).append(profile)
+    return by_ssid
+
+def _load_connections():
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_connections()
+        except Exception:
+            pass
+
+    try:
+        # nmcli's list has no SSID column; the profiles it creates are named after it
+        return [SavedConnection(r['name'], r['type'], r['uuid'],
+                                ssid=r['name'] if r['type'] in WIFI_CONNECTION_TYPES else None)
+                for r in nmcli_records(['NAME', 'UUID', 'TYPE'], 'connection', 'show')]
+    except:
+        return None
+
+CONNECTIONS = ConnectionIndex(_load_connections)
+
+def profile_label(key):
+    """Name of the profile a UUID refers to, or the key itself"""
+    profile = CONNECTIONS.get(key)
+    return profile.name if profile else key
+
+def uuid_args(profiles):
+    """nmcli connection up/down/delete arguments addressing profiles by UUID"""
+    return [arg for p in profiles for arg in ('uuid', p.uuid)]
+
+def added_uuid(output):
+    """UUID from nmcli's "Connection 'x' (<uuid>) successfully added." """
+    return output.rpartition('(')[2].partition(')')[0]
+
+def read_sysfs(iface, name):
+    """One attribute of /sys/class/net/<iface>, stripped, or None if unreadable"""
+    try:
+        with open(f"{SYSFS_NET}/{iface}/{name}") as f:
+            return f.read().strip()
+    except OSError:  # also EINVAL, e.g. carrier of an interface that is down
+        return None
+
+def sysfs_hwaddr(iface):
+    """Read an interface's MAC address from sysfs, or '' if unavailable"""
+    return read_sysfs(iface, 'address') or ''
+
+def link_info(iface):
+    """Link state and traffic counters of an interface, or None if it has none
+
+    Returns {'operstate', 'carrier', 'rx_bytes', 'tx_bytes', 'rx_errors', ...}
+    read straight from sysfs.
+    """
+    operstate = read_sysfs(iface, 'operstate')
+    if operstate is None:
+        return None
+    info = {'operstate': operstate, 'carrier': read_sysfs(iface, 'carrier') == '1'}
+    for counter in LINK_COUNTERS:
+        value = read_sysfs(iface, f"statistics/{counter}")
+        info[counter] = int(value) if value and value.isdigit() else 0
+    return info
+
+class LinkMeter:
+    """RX/TX throughput per interface from successive link_info() samples"""
+
+    def __init__(self):
+        self._last = {}  # iface -> (monotonic time, link_info)
+
+    def sample(self, iface):
+        """link_info() plus 'rx_rate' and 'tx_rate' in bytes/s since the last sample
+
+        Rates are None on the first sample and after a counter reset.
+        """
+        info = link_info(iface)
+        if info is None:
+            self._last.pop(iface, None)
+            return None
+        now = time.monotonic()
+        info['rx_rate'] = info['tx_rate'] = None
+        if iface in self._last:
+            then, prev = self._last[iface]
+            if now > then:
+                for direction in ('rx', 'tx'):
+                    delta = info[f'{direction}_bytes'] - prev[f'{direction}_bytes']
+                    if delta >= 0:
+                        info[f'{direction}_rate'] = delta / (now - then)
+        self._last[iface] = (now, info)
+        return info
+
+    def latest(self, iface):
+        """The last sample taken for iface, or None"""
+        return self._last.get(iface, (None, None))[1]
+
+# Properties whose changes affect what the main screen shows, per interface
+WATCHED_PROPERTIES = {
+    NM_BUS: {'WirelessEnabled', 'WirelessHardwareEnabled', 'WwanEnabled',
+             'WwanHardwareEnabled', 'ActiveConnections', 'State'},
+    NM_BUS + ".Device": {'State', 'ActiveConnection'},
+    NM_BUS + ".Device.Wireless": {'ActiveAccessPoint'},
+    NM_BUS + ".Connection.Active": {'State'},
+}
+
+class NetworkMonitor:
+    """Push NetworkManager change events to a callback
+
+    Listens for NetworkManager D-Bus signals on a private bus connection
+    driven by a GLib main loop thread. Without GLib it streams
+    `nmcli monitor` instead. The callback runs on the monitor thread and
+    receives small event dicts:
+      {'kind': 'strength', 'path': ap_path, 'signal': int}
+      {'kind': 'changed', 'reason': str}
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._bus = None
+        self._loop = None
+        self._proc = None
+
+    def start(self):
+        """Start watching; returns False when no event source is available"""
+        if HAS_DBUS and HAS_GLIB:
+            try:
+                self._start_dbus()
+                return True
+            except Exception:
+                self.stop()
+        try:
+            self._start_nmcli()
+            return True
+        except Exception:
+            return False
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.quit()
+            self._loop = None
+        if self._bus is not None:
+            self._bus.close()
+            self._bus = None
+        if self._proc is not None:
+            self._proc.terminate()
+            self._proc = None
+
+    def _start_dbus(self):
+        import dbus.mainloop.glib
+        from gi.repository import GLib
+        mainloop = dbus.mainloop.glib.DBusGMainLoop()
+        self._bus = bus = open_bus(mainloop=mainloop, private=True)
+        bus.add_signal_receiver(self._on_properties_changed, signal_name='PropertiesChanged',
+                                dbus_interface=PROPS_IFACE, bus_name=NM_BUS,
+                                path_keyword='path')
+        bus.add_signal_receiver(self._on_signal, signal_name='StateChanged',
+                                bus_name=NM_BUS, member_keyword='member')
+        bus.add_signal_receiver(self._on_name_owner_changed, signal_name='NameOwnerChanged',
+                                dbus_interface='org.freedesktop.DBus', arg0=NM_BUS)
+        for signal in ('DeviceAdded', 'DeviceRemoved'):
+            bus.add_signal_receiver(self._on_device_signal, signal_name=signal,
+                                    dbus_interface=NM_BUS, bus_name=NM_BUS,
+                                    member_keyword='member')
+        for signal in ('NewConnection', 'ConnectionRemoved'):
+            bus.add_signal_receiver(self._on_connection_signal, signal_name=signal,
+                                    dbus_interface=NM_BUS + ".Settings", bus_name=NM_BUS,
+                                    member_keyword='member')
+        bus.add_signal_receiver(self._on_connection_updated, signal_name='Updated',
+                                dbus_interface=NM_BUS + ".Settings.Connection",
+                                bus_name=NM_BUS, path_keyword='path')
+        for signal in ('AccessPointAdded', 'AccessPointRemoved'):
+            bus.add_signal_receiver(self._on_signal, signal_name=signal,
+                                    dbus_interface=NM_BUS + ".Device.Wireless",
+                                    bus_name=NM_BUS, member_keyword='member')
+        self._loop = GLib.MainLoop()
+        threading.Thread(target=self._loop.run, name="nm-monitor", daemon=True).start()
+
+    def _start_nmcli(self):
+        self._proc = subprocess.Popen(['nmcli', 'monitor'], stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL, text=True)
+        threading.Thread(target=self._read_nmcli, args=(self._proc,),
+                         name="nm-monitor", daemon=True).start()
+
+    def _read_nmcli(self, proc):
+        for line in proc.stdout:
+            if 'device created' in line or 'device removed' in line:
+                DEVICES.invalidate()
+            if 'connection profile' in line:  # created, changed or removed
+                CONNECTIONS.invalidate()
+            self.callback({'kind': 'changed', 'reason': line.strip()})
+
+    def _on_signal(self, *args, member=None):
+        self.callback({'kind': 'changed', 'reason': member})
+
+    def _on_name_owner_changed(self, name, old_owner, new_owner):
+        # NetworkManager restarted: drop proxies bound to the old instance
+        backend = get_backend()
+        if backend:
+            backend.reconnect()
+        self.callback({'kind': 'changed', 'reason': 'NameOwnerChanged'})
+
+    def _on_device_signal(self, *args, member=None):
+        DEVICES.invalidate()
+        self.callback({'kind': 'changed', 'reason': member})
+
+    def _on_connection_signal(self, path, member=None):
+        if member == 'ConnectionRemoved':
+            CONNECTIONS.discard_path(str(path))
+        else:
+            self._reload_profile(path)
+        self.callback({'kind': 'changed', 'reason': member})
+
+    def _on_connection_updated(self, path=None):
+        self._reload_profile(path)
+        self.callback({'kind': 'changed', 'reason': 'Updated'})
+
+    def _reload_profile(self, path):
+        backend = get_backend()
+        try:
+            CONNECTIONS.put(backend.get_connection(path))
+        except Exception:
+            CONNECTIONS.invalidate()
+
+    def _on_properties_changed(self, interface, changed, invalidated, path=None):
+        interface = str(interface)
+        if interface == NM_BUS + ".AccessPoint":
+            if set(changed) == {'Strength'}:
+                self.callback({'kind': 'strength', 'path': path,
+                               'signal': int(changed['Strength'])})
+            else:
+                self.callback({'kind': 'changed', 'reason': 'AccessPoint'})
+        elif WATCHED_PROPERTIES.get(interface, set()) & set(changed):
+            self.callback({'kind': 'changed', 'reason': interface})
+
+_backend = None
+
+def get_backend():
+    """Return the shared D-Bus backend, or None when dbus is unavailable"""
+    global _backend, dbus
+    if not HAS_DBUS:
+        return None
+    if _backend is None:
+        try:
+            import dbus
+            _backend = NetworkManagerBackend()
+        except Exception as e:
+            log.warning("D-Bus backend unavailable, using nmcli: %s", e)
+            return None
+    return _backend
+
+def dbus_settings(settings):
+    """Plain {setting: {property: value}} as the a{sa{sv}} NetworkManager takes"""
+    converted = {}
+    for name, props in settings.items():
+        section = converted[name] = {}
+        for key, value in props.items():
+            if key == 'ssid' and isinstance(value, str):
+                value = dbus.ByteArray(value.encode())
+            elif name == '802-1x' and key in CERT_PROPERTIES and isinstance(value, str):
+                uri = value if value.startswith("file://") else "file://" + value
+                value = dbus.ByteArray(uri.encode() + b"\0")
+            elif name in IP_FAMILIES and key == 'addresses' and isinstance(value, list):
+                key, value = 'address-data', dbus.Array(
+                    [address_data(address, IP_FAMILIES[name]) for address in value], signature='a{sv}')
+            elif name == 'ipv4' and key == 'dns' and isinstance(value, list):
+                value = dbus.Array([int.from_bytes(socket.inet_pton(socket.AF_INET, server), sys.byteorder)
+                                    for server in value], signature='u')
+            elif name == 'ipv6' and key == 'dns' and isinstance(value, list):
+                value = dbus.Array([dbus.ByteArray(socket.inet_pton(socket.AF_INET6, server))
+                                    for server in value], signature='ay')
+            elif isinstance(value, dict):
+                value = dbus.Dictionary(value, signature='ss')
+            elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+                value = dbus.Array(value, signature='s')
+            section[key] = value
+    return converted
+
+def address_data(address, family):
+    """"192.168.1.5/24" as an address-data entry (no prefix means a single host)"""
+    address, _, prefix = address.partition('/')
+    return dbus.Dictionary({'address': address,
+                            'prefix': dbus.UInt32(int(prefix or (32 if family == socket.AF_INET else 128)))},
+                           signature='sv')
+
+def text_settings(settings):
+    """Plain D-Bus settings with certificates, addresses and DNS servers as text
+
+    These are the forms nmcli prints and takes, and the ones profile files
+    hold; dbus_settings() converts them back.
+    """
+    eap = settings.get('802-1x', {})
+    for key in CERT_PROPERTIES & eap.keys():
+        if isinstance(eap[key], bytes):
+            eap[key] = eap[key].rstrip(b"\0").decode(errors='replace').removeprefix("file://")
+    for name, family in IP_FAMILIES.items():
+        ip = settings.get(name, {})
+        ip.pop('addresses', None)  # Deprecated form of address-data
+        if ip.get('address-data'):
+            ip['addresses'] = [f"{a['address']}/{a['prefix']}" for a in ip.pop('address-data')]
+        if ip.get('dns'):
+            ip['dns'] = [socket.inet_ntop(family, server.to_bytes(4, sys.byteorder)
+                                          if isinstance(server, int) else server)
+                         for server in ip['dns']]
+    return settings
+
+def plain_dbus(value):
+    """Unwrap dbus-python values into bool, int, str, bytes, list and dict"""
+    if isinstance(value, dbus.Boolean):
+        return bool(value)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if isinstance(value, dict):
+        return {str(k): plain_dbus(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(v, dbus.Byte) for v in value):
+            return bytes(value)
+        return [plain_dbus(v) for v in value]
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    return value
+
+def nmcli_setting_args(settings):
+    """{setting: {property: value}} as `nmcli connection add` arguments"""
+    args = []
+    for name, props in settings.items():
+        for key, value in props.items():
+            if isinstance(value, bool):
+                value = 'yes' if value else 'no'
+            elif isinstance(value, dict):
+                value = ', '.join(f"{k} = {v}" for k, v in value.items())
+            elif isinstance(value, list):
+                value = ','.join(map(str, value))
+            args += [f"{name}.{key}", str(value)]
+    return args
+
+def parse_nmcli_settings(lines):
+    """`nmcli -t connection show <profile>` output as {setting: {property: value}}
+
+    Only the lower-case setting properties are kept (not GENERAL.*, IP4.*).
+    Empty values are dropped, yes/no become bools and the vpn.data style
+    properties become dicts.
+    """
+    settings = {}
+    for line in lines:
+        fields = split_terse(line)
+        if len(fields) != 2:
+            continue
+        prop, value = fields
+        name, _, key = prop.partition('.')
+        if not key or not name.islower() or value in ('', '--', '<hidden>'):
+            continue
+        if prop in NMCLI_DICT_PROPERTIES:
+            value = dict(item.split(' = ', 1) for item in value.split(', ') if ' = ' in item)
+        elif prop in NMCLI_LIST_PROPERTIES:
+            value = value.split(',')
+        elif value in ('yes', 'no'):
+            value = value == 'yes'
+        settings.setdefault(name, {})[key] = value
+    return settings
+
+def merge_settings(saved, new):
+    """A saved profile's settings with the sections a connect attempt sets
+
+    The profile keeps its name and UUID. Sections that hold secrets are
+    replaced whole, so switching from PSK to 802.1X leaves no stale keys,
+    and a saved 802-1x section goes once the attempt picks a key-mgmt
+    without it; the others are updated property by property.
+    """
+    merged = {name: dict(props) for name, props in saved.items()}
+    for name, props in new.items():
+        if name == 'connection':
+            props = {k: v for k, v in props.items() if k not in ('id', 'uuid')}
+        if name in SECRET_SETTINGS:
+            # key-mgmt carries over when the attempt leaves it to NetworkManager
+            kept = {k: v for k, v in merged.get(name, {}).items() if k == 'key-mgmt'}
+            merged[name] = dict(kept, **props)
+        else:
+            merged.setdefault(name, {}).update(props)
+    key_mgmt = new.get('802-11-wireless-security', {}).get('key-mgmt')
+    if key_mgmt and key_mgmt not in EAP_KEY_MGMT:
+        merged.pop('802-1x', None)
+    return merged
+
+def wifi_security(security, password):
+    """802-11-wireless-security for a password on an AP advertising `security`
+
+    key-mgmt follows what the AP offers now ("" when unknown means WPA), so
+    a profile saved when the network used other security does not keep it.
+    """
+    if security.startswith('WEP'):
+        return {'key-mgmt': 'none', 'wep-key0': password}
+    if 'WPA3' in security and 'WPA2' not in security and 'WPA1' not in security:
+        return {'key-mgmt': 'sae', 'psk': password}
+    return {'key-mgmt': 'wpa-psk', 'psk': password}
+
+def replaced_profiles(settings):
+    """Saved profiles an imported profile replaces: same UUID, else same name and type"""
+    con = settings['connection']
+    if con.get('uuid'):
+        profile = CONNECTIONS.get(con['uuid'])
+        return [profile] if profile else []
+    return [p for p in CONNECTIONS.profiles() if p.name == con['id'] and p.type == con['type']]
+
+def eap_settings(username, password, eap_method, phase2_auth):
+    """Build the 802-1x setting section for PEAP/TTLS/TLS"""
+    eap = eap_method.lower()
+    settings = {'eap': [eap], 'identity': username}
+    if eap in ['peap', 'ttls']:
+        settings['phase2-auth'] = phase2_auth.lower()
+        settings['password'] = password
+    elif eap == 'tls':
+        settings['private-key-password'] = password
+    return settings
 
 def get_wifi_interface():
-    """Auto-detect WiFi interface"""
-    try:
-        result = subprocess.run(['nmcli', '-t', '-f', 'DEVICE,TYPE', 'device'],
-                               capture_output=True, text=True, check=True)
-        for line in result.stdout.strip().split('\n'):
-            if ':wifi' in line:
-                return line.split(':')[0]
-    except:
-        pass
-    return 'wlan0'
+    """Auto-detect WiFi interface (the first one if there are several)"""
+    dev = DEVICES.first('wifi')
+    return dev['iface'] if dev else 'wlan0'
 
 def get_wifi_list():
     """Get available WiFi networks"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_wifi_list()
+        except Exception:
+            pass
+
     try:
-        result = subprocess.run(
-            ['nmcli', '-t', '-f', 'SSID,SIGNAL,SECURITY,IN-USE', 'device', 'wifi', 'list'],
-            capture_output=True, text=True, check=True)
-        
-        networks, seen = [], set()
-        for line in result.stdout.strip().split('\n'):
-            if not line:
-                continue
-            parts = line.split(':')
-            if len(parts) >= 4 and parts[0] and parts[0] not in seen:
-                seen.add(parts[0])
-                networks.append({
-                    'ssid': parts[0],
-                    'signal': int(parts[1]) if parts[1] else 0,
-                    'security': parts[2],
-                    'connected': parts[3] == '*'
-                })
-        return sorted(networks, key=lambda x: x['signal'], reverse=True)
+        records = nmcli_records(WIFI_LIST_FIELDS, 'device', 'wifi', 'list')
+        return group_networks([AccessPoint.from_nmcli(r) for r in records])
     except:
         return []
 
 def get_current_connection():
     """Get active connection name"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_current_connection()
+        except Exception:
+            pass
+
     try:
-        result = subprocess.run(['nmcli', '-t', '-f', 'NAME', 'connection', 'show', '--active'],
-                               capture_output=True, text=True, check=True)
-        return result.stdout.strip().split('\n')[0] or None
+        active = nmcli_records(['NAME'], 'connection', 'show', '--active')
+        return active[0]['name'] if active else None
     except:
         return None
 
 def get_station_info():
     """Get station status"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_station_info()
+        except Exception:
+            pass
+
     try:
         current = get_current_connection()
         info = {'state': 'connected' if current else 'disconnected', 
                 'scanning': 'false', 'frequency': '-', 'security': '-'}
         
         if current:
-            result = subprocess.run(['nmcli', '-t', '-f', 'ACTIVE,SSID,FREQ,SECURITY', 
-                                    'device', 'wifi', 'list'], capture_output=True, text=True)
-            for line in result.stdout.strip().split('\n'):
-                if line.startswith('yes:') or line.startswith('*:'):
-                    parts = line.split(':')
-                    if len(parts) >= 4:
-                        info['frequency'] = parts[2] or '-'
-                        info['security'] = parts[3] or '-'
+            for n in get_wifi_list():
+                if n.connected:
+                    if n.frequency:
+                        info['frequency'] = f"{n.frequency} MHz"
+                    info['security'] = n.security or '-'
                     break
         return info
     except:
         return {'state': 'disconnected', 'scanning': 'false', 'frequency': '-', 'security': '-'}
 
+def save_snapshot(snapshot, path=SNAPSHOT_CACHE):
+    """Write a snapshot to the cache file; a failed write is not an error"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(snapshot.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp, path)  # readers never see a half-written file
+    except (OSError, TypeError, ValueError):
+        pass
+
+def load_snapshot(path=SNAPSHOT_CACHE):
+    """Return the cached snapshot from a previous run, or None"""
+    try:
+        with open(path) as f:
+            return NetworkSnapshot.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+_query_pool = None
+_query_pool_lock = threading.Lock()
+
+def query_pool():
+    """Shared, bounded thread pool for independent nmcli queries"""
+    global _query_pool
+    with _query_pool_lock:
+        if _query_pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _query_pool = ThreadPoolExecutor(max_workers=QUERY_WORKERS,
+                                             thread_name_prefix="nm-query")
+        return _query_pool
+
+@log_duration
+def get_snapshot():
+    """Collect everything the main screen renders in a single pass"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_snapshot()
+        except Exception as e:
+            log.warning("get_snapshot over D-Bus failed: %s", e)
+
+    # Each nmcli call is a separate process; run them together, not in turn
+    pool = query_pool()
+    devices = pool.submit(DEVICES.devices)
+    connections = pool.submit(get_connection_list)
+    wifi = pool.submit(wifi_enabled)
+    wwan = pool.submit(wwan_enabled)
+    networks = pool.submit(get_wifi_list)
+    devices = [dict(dev, hwaddr=sysfs_hwaddr(dev['iface'])) for dev in devices.result()]
+    connections = connections.result()
+    active = [c for c in connections if c.active]
+    return NetworkSnapshot(devices, wifi.result(), wwan.result(), networks.result(),
+                           connections, active)
+
+@log_duration
+def scan_wifi(cancelled=lambda: False, timeout=SCAN_TIMEOUT):
+    """Rescan and block until NetworkManager has published the results
+
+    Returns True once results newer than the request are available, and
+    False on timeout, cancellation or failure.
+    """
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.scan(cancelled, timeout)
+        except Exception:
+            pass
+
+    try:
+        # --rescan yes makes nmcli wait for the scan to complete
+        proc = subprocess.Popen(['nmcli', '-t', '-f', 'SSID', 'device', 'wifi', 'list',
+                                 '--rescan', 'yes'],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        while proc.poll() is None:
+            if cancelled() or time.monotonic() > deadline:
+                proc.terminate()
+                return False
+            time.sleep(SCAN_POLL_INTERVAL)
+        return proc.returncode == 0
+    except:
+        return False
+
+class ScanEngine:
+    """Debounced, cancellable WiFi scans that finish when results are fresh
+
+    request() may be called from any thread. Requests made while a scan is
+    pending or running merge into it, so repeated key presses cost a single
+    radio scan. on_done(fresh) runs on the scan thread once NetworkManager
+    has published results (fresh is False on timeout or failure); it is not
+    called for cancelled scans.
+    """
+
+    def __init__(self, on_done, debounce=0.2, timeout=SCAN_TIMEOUT):
+        self.on_done = on_done
+        self.debounce = debounce
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def scanning(self):
+        return self._thread is not None and not self._cancel.is_set()
+
+    def request(self):
+        """Start a scan unless one is in flight; returns False if merged"""
+        with self._lock:
+            if self.scanning:
+                return False
+            self._cancel = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._cancel,),
+                                            name="wifi-scan", daemon=True)
+            self._thread.start()
+            return True
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self, cancel):
+        fresh = not cancel.wait(self.debounce) and scan_wifi(cancel.is_set, self.timeout)
+        with self._lock:
+            if self._thread is threading.current_thread():
+                self._thread = None
+        if not cancel.is_set():
+            self.on_done(fresh)
+
+def connection_up(key):
+    """Activate the saved profile a UUID, SSID or name refers to"""
+    profiles = CONNECTIONS.lookup(key)
+    if not profiles:
+        return False, f"unknown connection '{key}'"
+    uuid = profiles[0].uuid
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.connection_up(uuid)
+        except Exception:
+            pass
+
+    try:
+        trace_step('nmcli')
+        result = run_activation(['connection', 'up', 'uuid', uuid], uuid=uuid)
+        return result.returncode == 0, result.stderr or result.stdout
+    except Exception as e:
+        return False, str(e)
+
+def run_activation(args, iface=None, uuid=None):
+    """Run an activating nmcli command as a step of the current ConnectJob
+
+    nmcli gets the job's timeout as --wait rather than its own 90 s. While
+    it waits, the device state is noted for trace_step(), and a cancelled
+    job stops nmcli and deactivates what it started. Returns a
+    CompletedProcess.
+    """
+    job = current_job()
+    timeout = job.timeout if job else CONNECT_TIMEOUT
+    cmd = ['nmcli', '--wait', str(max(1, round(timeout))), *args]
+    if job and job.cancelled:  # e.g. cancelled before the D-Bus attempt gave up
+        trace_step('cancelled')
+        return subprocess.CompletedProcess(cmd, 1, "", "Cancelled")
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as proc:
+        while True:
+            try:
+                out, err = proc.communicate(timeout=NMCLI_ACTIVATION_POLL)
+                break
+            except subprocess.TimeoutExpired:
+                if job and job.cancelled:
+                    proc.terminate()
+                    trace_step('cancelled')
+                    nmcli_deactivate(iface, uuid)
+                    return subprocess.CompletedProcess(cmd, 1, "", "Cancelled")
+                state = nmcli_device_state(iface) if iface else None
+                if state:
+                    trace_step(state)
+    if proc.returncode == NMCLI_TIMEOUT_EXIT:
+        trace_step('timeout')
+        nmcli_deactivate(iface, uuid)
+    return subprocess.CompletedProcess(cmd, proc.returncode, out, err)
+
+def nmcli_device_state(iface):
+    """DEVICE_STATES name of an interface's state, or None"""
+    result = subprocess.run(['nmcli', '-g', 'GENERAL.STATE', 'device', 'show', iface],
+                            capture_output=True, text=True)
+    try:
+        return DEVICE_STATES.get(int(result.stdout.split()[0]))
+    except (ValueError, IndexError):
+        return None
+
+def nmcli_deactivate(iface=None, uuid=None):
+    """Stop an activation nmcli was waiting for (DeactivateConnection)"""
+    if uuid:
+        subprocess.run(['nmcli', 'connection', 'down', 'uuid', uuid], capture_output=True)
+    elif iface:
+        subprocess.run(['nmcli', 'device', 'disconnect', iface], capture_output=True)
+
+def connection_down(key):
+    """Deactivate the profile a UUID or name refers to"""
+    profiles = CONNECTIONS.lookup(key)
+    if not profiles:
+        return False
+    backend = get_backend()
+    if backend:
+        try:
+            return any([backend.connection_down(p.uuid) for p in profiles])
+        except Exception:
+            pass
+
+    try:
+        result = subprocess.run(['nmcli', 'connection', 'down', *uuid_args(profiles)],
+                               capture_output=True, text=True)
+        return result.returncode == 0
+    except:
+        return False
+
+@timed_connect('saved')
+def connect_saved(key):
+    """Activate a saved connection profile by UUID (or SSID/name)"""
+    return connection_up(key)
+
+@timed_connect('wifi')
 def connect_wifi(ssid, password, hidden=False):
     """Connect to WiFi (supports hidden SSIDs)"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.connect_wifi(ssid, password, hidden)
+        except Exception:
+            pass
+
     try:
-        cmd = ['nmcli', 'device', 'wifi', 'connect', ssid]
+        saved = CONNECTIONS.for_ssid(ssid)
+        if saved:
+            # `device wifi connect` would rewrite the saved profile before
+            # trying it, so try the new settings on it in memory first
+            props = ['wifi.hidden', 'yes'] if hidden else []
+            if password:
+                security = next((n.security for n in get_wifi_list() if n.ssid == ssid), "")
+                props.extend(nmcli_setting_args({'wifi-sec': wifi_security(security, password)}))
+                key_mgmt = subprocess.run(['nmcli', '-g', '802-11-wireless-security.key-mgmt',
+                                           'connection', 'show', 'uuid', saved[0].uuid],
+                                          capture_output=True, text=True).stdout.strip()
+                if key_mgmt in EAP_KEY_MGMT:
+                    props.extend(['remove', '802-1x'])  # Was enterprise, now a password
+            return nmcli_trial_modify(saved[0], props, get_wifi_interface())
+
+        trace_step('nmcli')
+        cmd = ['device', 'wifi', 'connect', ssid]
         if password:
             cmd.extend(['password', password])
         if hidden:
             cmd.append('hidden')
             cmd.append('yes')
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_activation(cmd, iface=get_wifi_interface())
         
         # If connection failed, delete the connection profile that was created
         if result.returncode != 0:
-            subprocess.run(['nmcli', 'connection', 'delete', ssid], 
-                          capture_output=True, text=True)
+            CONNECTIONS.invalidate()
+            created = CONNECTIONS.for_ssid(ssid)
+            if created:
+                subprocess.run(['nmcli', 'connection', 'delete', *uuid_args(created)],
+                              capture_output=True, text=True)
         
         return result.returncode == 0, result.stderr or result.stdout
     except Exception as e:
         return False, str(e)
 
+@timed_connect('802.1x')
 def connect_802_1x(ssid, username, password, eap_method="peap", phase2_auth="mschapv2", hidden=False):
     """Connect to 802.1X enterprise WiFi (supports hidden SSIDs)
     
@@ -102,60 +2165,132 @@ def connect_802_1x(ssid, username, password, eap_method="peap", phase2_auth="msc
     - Phase2: mschapv2, mschap, pap, chap, gtc, md5
     - Hidden SSID networks
     """
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.connect_802_1x(ssid, username, password, eap_method, phase2_auth, hidden)
+        except Exception:
+            pass
+
     try:
         iface = get_wifi_interface()
-        subprocess.run(['nmcli', 'connection', 'delete', ssid], capture_output=True)
         
-        # Build command based on EAP method
-        cmd = [
-            'nmcli', 'connection', 'add', 'type', 'wifi', 'con-name', ssid,
-            'ifname', iface, 'ssid', ssid, 'wifi-sec.key-mgmt', 'wpa-eap',
+        # Build the settings based on EAP method
+        props = [
+            'wifi-sec.key-mgmt', 'wpa-eap',
             '802-1x.eap', eap_method.lower(), '802-1x.identity', username
         ]
         
         # Add hidden SSID support
         if hidden:
-            cmd.extend(['wifi.hidden', 'yes'])
+            props.extend(['wifi.hidden', 'yes'])
         
         # Add auth-specific parameters
         if eap_method.lower() in ['peap', 'ttls']:
             # PEAP and TTLS use phase2 auth + password
-            cmd.extend(['802-1x.phase2-auth', phase2_auth.lower()])
-            cmd.extend(['802-1x.password', password])
+            props.extend(['802-1x.phase2-auth', phase2_auth.lower()])
+            props.extend(['802-1x.password', password])
         elif eap_method.lower() == 'tls':
             # TLS uses certificates (for now, treat password as private key password)
-            cmd.extend(['802-1x.private-key-password', password])
+            props.extend(['802-1x.private-key-password', password])
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        saved = CONNECTIONS.for_ssid(ssid)  # Before the add, which may reload the index
+        if saved:
+            return nmcli_trial_modify(saved[0], props, iface)
+        # A new profile stays in memory until it works
+        trace_step('add-profile')
+        result = subprocess.run(['nmcli', 'connection', 'add', 'save', 'no', 'type', 'wifi',
+                                 'con-name', ssid, 'ifname', iface, 'ssid', ssid, *props],
+                                capture_output=True, text=True)
         
         if result.returncode != 0:
             return False, result.stderr
         
-        result = subprocess.run(['nmcli', 'connection', 'up', ssid],
-                               capture_output=True, text=True)
-        
-        # If connection failed, delete the connection profile that was created
-        if result.returncode != 0:
-            subprocess.run(['nmcli', 'connection', 'delete', ssid], 
-                          capture_output=True, text=True)
-        
-        return result.returncode == 0, result.stderr or "Connected"
+        return nmcli_trial_up(added_uuid(result.stdout), ssid, iface)
     except Exception as e:
         return False, str(e)
 
+def nmcli_trial_modify(profile, props, iface=None):
+    """Try `connection modify` arguments on a saved profile, writing them only if it works
+
+    The change is made with --temporary, so the profile keeps everything
+    else it holds (addresses, DNS, certificates, ...) and its file stays
+    as it was until the profile comes up. A failed attempt reloads it from
+    that file.
+    """
+    uuid = profile.uuid
+    if props:
+        try:
+            filename = next((r['filename'] for r in nmcli_records(['UUID', 'FILENAME'], 'connection', 'show')
+                             if r['uuid'] == uuid and r['filename']), None)
+        except subprocess.CalledProcessError:
+            filename = None  # Reload every profile instead
+        trace_step('update-profile')
+        result = subprocess.run(['nmcli', 'connection', 'modify', '--temporary', 'uuid', uuid, *props],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            return False, result.stderr
+    trace_step('nmcli')
+    result = run_activation(['connection', 'up', 'uuid', uuid], iface=iface, uuid=uuid)
+    if not props:
+        return result.returncode == 0, result.stderr or result.stdout
+    if result.returncode == 0:
+        trace_step('save')
+        # modify without --temporary writes the whole profile to disk
+        subprocess.run(['nmcli', 'connection', 'modify', 'uuid', uuid, *props], capture_output=True)
+        return True, "Connected"
+    trace_step('rollback')
+    subprocess.run(['nmcli', 'connection', *(['load', filename] if filename else ['reload'])],
+                   capture_output=True)
+    return False, result.stderr or result.stdout
+
+def nmcli_trial_up(uuid, name, iface=None):
+    """Activate a profile added with `save no`; keep it only if it works"""
+    trace_step('nmcli')
+    result = run_activation(['connection', 'up', 'uuid', uuid], iface=iface, uuid=uuid)
+    if result.returncode != 0:
+        # Never written to disk, so the saved profiles are as they were
+        subprocess.run(['nmcli', 'connection', 'delete', 'uuid', uuid], capture_output=True)
+        return False, result.stderr or result.stdout
+    trace_step('save')
+    # modify without --temporary writes the whole profile to disk
+    subprocess.run(['nmcli', 'connection', 'modify', 'uuid', uuid, 'connection.id', name],
+                   capture_output=True)
+    return True, "Connected"
+
 def forget_network(ssid):
-    """Delete saved WiFi network by SSID"""
+    """Delete every saved profile for an SSID"""
+    profiles = CONNECTIONS.lookup(ssid)
+    if not profiles:
+        return False
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.forget(profiles)
+        except Exception:
+            pass
+
     try:
-        result = subprocess.run(['nmcli', 'connection', 'delete', ssid],
+        result = subprocess.run(['nmcli', 'connection', 'delete', *uuid_args(profiles)],
                                capture_output=True, text=True)
+        for profile in profiles:
+            CONNECTIONS.discard(profile.uuid)
         return result.returncode == 0
     except:
         return False
 
 def disconnect():
     """Disconnect from network"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.disconnect_device('wifi')
+        except Exception:
+            pass
+
     try:
-        result = subprocess.run(['nmcli', 'device', 'disconnect', get_wifi_interface()],
+        ifaces = [dev['iface'] for dev in DEVICES.by_type('wifi')] or [get_wifi_interface()]
+        result = subprocess.run(['nmcli', 'device', 'disconnect', *ifaces],
                                capture_output=True, text=True)
         return result.returncode == 0
     except:
@@ -163,17 +2298,13 @@ def disconnect():
 
 def wifi_enabled():
     """Check if WiFi is enabled"""
-    if HAS_DBUS:
-        try:
-            bus = dbus.SystemBus()
-            nm = bus.get_object("org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager")
-            props = dbus.Interface(nm, "org.freedesktop.DBus.Properties")
-            sw = bool(props.Get("org.freedesktop.NetworkManager", "WirelessEnabled"))
-            hw = bool(props.Get("org.freedesktop.NetworkManager", "WirelessHardwareEnabled"))
-            return sw and hw
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.radios()['wifi']
         except Exception:
             pass
-            
+
     try:
         result = subprocess.run(['nmcli', 'radio', 'wifi'], capture_output=True, text=True)
         return result.stdout.strip() == 'enabled'
@@ -182,17 +2313,12 @@ def wifi_enabled():
 
 def toggle_wifi():
     """Toggle WiFi on/off"""
-    if HAS_DBUS:
-        try:
-            bus = dbus.SystemBus()
-            nm = bus.get_object("org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager")
-            props = dbus.Interface(nm, "org.freedesktop.DBus.Properties")
-            current = bool(props.Get("org.freedesktop.NetworkManager", "WirelessEnabled"))
-            props.Set("org.freedesktop.NetworkManager", "WirelessEnabled", not current)
-            return not current
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.toggle_radio('wifi')
         except Exception as e:
-            with open("/tmp/gazelle_debug.log", "a") as f:
-                f.write(f"WiFi Toggle DBus Error: {e}\n")
+            log.warning("WiFi toggle over D-Bus failed: %s", e)
 
     try:
         enabled = wifi_enabled()
@@ -203,17 +2329,13 @@ def toggle_wifi():
 
 def wwan_enabled():
     """Check if WWAN is enabled"""
-    if HAS_DBUS:
-        try:
-            bus = dbus.SystemBus()
-            nm = bus.get_object("org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager")
-            props = dbus.Interface(nm, "org.freedesktop.DBus.Properties")
-            sw = bool(props.Get("org.freedesktop.NetworkManager", "WwanEnabled"))
-            hw = bool(props.Get("org.freedesktop.NetworkManager", "WwanHardwareEnabled"))
-            return sw and hw
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.radios()['wwan']
         except Exception:
             pass
-            
+
     try:
         result = subprocess.run(['nmcli', 'radio', 'wwan'], capture_output=True, text=True)
         return result.stdout.strip() == 'enabled'
@@ -222,17 +2344,12 @@ def wwan_enabled():
 
 def toggle_wwan():
     """Toggle WWAN on/off"""
-    if HAS_DBUS:
-        try:
-            bus = dbus.SystemBus()
-            nm = bus.get_object("org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager")
-            props = dbus.Interface(nm, "org.freedesktop.DBus.Properties")
-            current = bool(props.Get("org.freedesktop.NetworkManager", "WwanEnabled"))
-            props.Set("org.freedesktop.NetworkManager", "WwanEnabled", not current)
-            return not current
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.toggle_radio('wwan')
         except Exception as e:
-            with open("/tmp/gazelle_debug.log", "a") as f:
-                f.write(f"WWAN Toggle DBus Error: {e}\n")
+            log.warning("WWAN toggle over D-Bus failed: %s", e)
 
     try:
         enabled = wwan_enabled()
@@ -243,16 +2360,10 @@ def toggle_wwan():
 
 def get_ethernet_interface():
     """Auto-detect Ethernet interface"""
-    try:
-        result = subprocess.run(['nmcli', '-t', '-f', 'DEVICE,TYPE', 'device'],
-                               capture_output=True, text=True, check=True)
-        for line in result.stdout.strip().split('\n'):
-            if ':ethernet' in line:
-                return line.split(':')[0]
-    except:
-        pass
-    return None
+    dev = DEVICES.first('ethernet')
+    return dev['iface'] if dev else None
 
+@timed_connect('802.1x-wired')
 def connect_802_1x_wired(con_name, username, password, eap_method="peap", phase2_auth="mschapv2"):
     """Connect to 802.1X enterprise wired network
 
@@ -260,45 +2371,53 @@ def connect_802_1x_wired(con_name, username, password, eap_method="peap", phase2
     - EAP: peap, ttls, tls
     - Phase2: mschapv2, mschap, pap, chap, gtc, md5
     """
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.connect_802_1x_wired(con_name, username, password, eap_method, phase2_auth)
+        except Exception:
+            pass
+
     try:
         iface = get_ethernet_interface()
         if not iface:
             return False, "No Ethernet interface found"
 
-        subprocess.run(['nmcli', 'connection', 'delete', con_name], capture_output=True)
-
-        # Build command for wired 802.1X
-        cmd = [
-            'nmcli', 'connection', 'add', 'type', '802-3-ethernet', 'con-name', con_name,
-            'ifname', iface, '802-1x.eap', eap_method.lower(), '802-1x.identity', username
-        ]
+        # Build the settings for wired 802.1X
+        props = ['802-1x.eap', eap_method.lower(), '802-1x.identity', username]
 
         # Add auth-specific parameters
         if eap_method.lower() in ['peap', 'ttls']:
-            cmd.extend(['802-1x.phase2-auth', phase2_auth.lower()])
-            cmd.extend(['802-1x.password', password])
+            props.extend(['802-1x.phase2-auth', phase2_auth.lower()])
+            props.extend(['802-1x.password', password])
         elif eap_method.lower() == 'tls':
-            cmd.extend(['802-1x.private-key-password', password])
+            props.extend(['802-1x.private-key-password', password])
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        saved = [p for p in CONNECTIONS.lookup(con_name) if p.type == '802-3-ethernet']
+        if saved:
+            return nmcli_trial_modify(saved[0], props, iface)
+        # A new profile stays in memory until it works
+        trace_step('add-profile')
+        result = subprocess.run(['nmcli', 'connection', 'add', 'save', 'no', 'type', '802-3-ethernet',
+                                 'con-name', con_name, 'ifname', iface, *props],
+                                capture_output=True, text=True)
 
         if result.returncode != 0:
             return False, result.stderr
 
-        result = subprocess.run(['nmcli', 'connection', 'up', con_name],
-                               capture_output=True, text=True)
-
-        # If connection failed, delete the connection profile that was created
-        if result.returncode != 0:
-            subprocess.run(['nmcli', 'connection', 'delete', con_name],
-                          capture_output=True, text=True)
-
-        return result.returncode == 0, result.stderr or "Connected"
+        return nmcli_trial_up(added_uuid(result.stdout), con_name, iface)
     except Exception as e:
         return False, str(e)
 
 def disconnect_ethernet():
     """Disconnect from wired network"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.disconnect_device('ethernet')
+        except Exception:
+            pass
+
     try:
         iface = get_ethernet_interface()
         if not iface:
@@ -317,65 +2436,144 @@ def is_owe(security):
     """Check if network uses OWE (Enhanced Open / WPA3-OWE)"""
     return 'OWE' in security or 'WPA3-OWE' in security
 
-def get_vpn_list():
-    """Get all VPN connections configured in NetworkManager"""
+def security_label(security):
+    """Short security category shown in the network tables"""
+    if is_enterprise(security):
+        return "802.1x"
+    if is_owe(security):
+        return "owe"
+    return "psk" if security else "-"
+
+def import_connections(batch):
+    """Save many profiles in one pass without activating any of them
+
+    `batch` holds {setting: {property: value}} dicts (profiles.py builds
+    them from a TOML file). A saved profile with the same UUID, or else the
+    same name and type, is replaced once NetworkManager has accepted the new
+    settings. Returns (ok, uuid or error) per profile.
+    """
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.add_connections(batch)
+        except Exception:
+            pass
+
+    results = []
+    for settings in batch:
+        try:
+            stale = replaced_profiles(settings)
+            con = settings['connection']
+            if con.get('uuid') and stale:
+                # The UUID is taken until the old profile goes, so try the
+                # settings as an unsaved profile under a fresh UUID first
+                check = dict(settings, connection={k: v for k, v in con.items() if k != 'uuid'})
+                result = subprocess.run(['nmcli', 'connection', 'add', 'save', 'no',
+                                         *nmcli_setting_args(check)], capture_output=True, text=True)
+                if result.returncode != 0:
+                    results.append((False, result.stderr.strip()))
+                    continue
+                subprocess.run(['nmcli', 'connection', 'delete', 'uuid', added_uuid(result.stdout),
+                                *uuid_args(stale)], capture_output=True)
+                stale = []
+            result = subprocess.run(['nmcli', 'connection', 'add', *nmcli_setting_args(settings)],
+                                   capture_output=True, text=True)
+            if result.returncode == 0:
+                results.append((True, added_uuid(result.stdout)))
+            else:
+                results.append((False, result.stderr.strip()))
+            if result.returncode == 0 and stale:  # Only once the new profile is saved
+                subprocess.run(['nmcli', 'connection', 'delete', *uuid_args(stale)],
+                               capture_output=True)
+        except Exception as e:
+            results.append((False, str(e)))
+    CONNECTIONS.invalidate()
+    return results
+
+def get_connection_settings(secrets=False):
+    """Every saved profile as {setting: {property: value}}
+
+    With `secrets`, passwords and keys are included where NetworkManager
+    hands them out (it may ask a polkit agent first).
+    """
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_connection_settings(secrets)
+        except Exception:
+            pass
+
+    profiles = []
+    for profile in CONNECTIONS.profiles():
+        try:
+            result = subprocess.run(['nmcli', '-t', '--escape', 'yes', *(['-s'] if secrets else []),
+                                     'connection', 'show', 'uuid', profile.uuid],
+                                    capture_output=True, text=True, check=True)
+            profiles.append(parse_nmcli_settings(result.stdout.splitlines()))
+        except Exception:
+            pass
+    return profiles
+
+def get_active_uuids():
+    """UUIDs of the profiles that are currently active"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_active_uuids()
+        except Exception:
+            pass
+
     try:
-        result = subprocess.run(['nmcli', '-t', '-f', 'NAME,TYPE', 'connection', 'show'],
-                               capture_output=True, text=True, check=True)
-        active_vpn = get_active_vpn()
-        vpns = []
-        
-        # VPN types supported by NetworkManager
-        vpn_types = [':vpn', ':wireguard', ':vpnc', ':pptp', ':openconnect', ':openvpn']
-        
-        for line in result.stdout.strip().split('\n'):
-            # Check if line contains any VPN type
-            if any(vpn_type in line for vpn_type in vpn_types):
-                name = line.split(':')[0]
-                vpns.append({
-                    'name': name,
-                    'active': name == active_vpn
-                })
-        return sorted(vpns, key=lambda x: (not x['active'], x['name']))
+        return {r['uuid'] for r in nmcli_records(['UUID'], 'connection', 'show', '--active')}
     except:
-        return []
+        return set()
+
+def get_connection_list():
+    """Saved profiles from CONNECTIONS with their active flag set"""
+    active = get_active_uuids()
+    return [c._replace(active=c.uuid in active) for c in CONNECTIONS.profiles()]
+
+def get_vpn_list():
+    """Get all VPN connections configured in NetworkManager, active first"""
+    vpns = [VpnConnection(c.name, c.active, c.uuid)
+            for c in get_connection_list() if c.type in VPN_TYPES]
+    return sorted(vpns, key=lambda v: (not v.active, v.name))
 
 def get_active_vpn():
     """Get currently active VPN connection name"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_active_of_types(VPN_TYPES)
+        except Exception:
+            pass
+
     try:
-        result = subprocess.run(['nmcli', '-t', '-f', 'NAME,TYPE', 'connection', 'show', '--active'],
-                               capture_output=True, text=True, check=True)
-        
-        # VPN types supported by NetworkManager
-        vpn_types = [':vpn', ':wireguard', ':vpnc', ':pptp', ':openconnect', ':openvpn']
-        
-        for line in result.stdout.strip().split('\n'):
-            if any(vpn_type in line for vpn_type in vpn_types):
-                return line.split(':')[0]
+        for c in nmcli_records(['NAME', 'TYPE'], 'connection', 'show', '--active'):
+            if c['type'] in VPN_TYPES:
+                return c['name']
         return None
     except:
         return None
 
-def connect_vpn(name):
-    """Connect to VPN by name"""
-    try:
-        result = subprocess.run(['nmcli', 'connection', 'up', name],
-                               capture_output=True, text=True)
-        return result.returncode == 0, result.stderr or result.stdout
-    except Exception as e:
-        return False, str(e)
+@timed_connect('vpn')
+def connect_vpn(key):
+    """Connect to VPN by profile UUID (or name)"""
+    return connection_up(key)
 
-def disconnect_vpn(name):
-    """Disconnect VPN by name"""
-    try:
-        result = subprocess.run(['nmcli', 'connection', 'down', name],
-                               capture_output=True, text=True)
-        return result.returncode == 0
-    except:
-        return False
+def disconnect_vpn(key):
+    """Disconnect VPN by profile UUID (or name)"""
+    return connection_down(key)
 
 def get_modem_info():
     """Get modem information via ModemManager"""
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_modem_info()
+        except Exception:
+            pass
+
     try:
         # Get modem list
         result = subprocess.run(['mmcli', '--list-modems'],
@@ -401,50 +2599,48 @@ def get_modem_info():
             line = line.strip()
             if 'signal quality:' in line:
                 # Extract percentage (e.g., "48% (cached)")
-                info['signal'] = line.split(':')[1].strip().split()[0]
+                info['signal'] = line.partition(':')[2].strip().split()[0]
             elif 'operator name:' in line:
-                info['operator'] = line.split(':')[1].strip()
+                info['operator'] = line.partition(':')[2].strip()
             elif 'access tech:' in line:
-                info['tech'] = line.split(':')[1].strip().upper()
+                info['tech'] = line.partition(':')[2].strip().upper()
             elif 'state:' in line:
                 # Extract state, removing ANSI color codes
-                state = line.split(':')[1].strip()
+                state = line.partition(':')[2].strip()
                 # Remove ANSI codes like [32mconnected[0m
                 state = state.replace('[32m', '').replace('[0m', '')
                 info['state'] = state
 
-        return info
+        return ModemStatus(**info)
     except:
         return None
 
 def get_wwan_list():
     """Get all WWAN (cellular) connections configured in NetworkManager"""
     try:
-        result = subprocess.run(['nmcli', '-t', '-f', 'NAME,TYPE', 'connection', 'show'],
-                               capture_output=True, text=True, check=True)
-        active_wwan = get_active_wwan()
         modem_info = get_modem_info()
 
         wwans = []
-        for line in result.stdout.strip().split('\n'):
-            if ':gsm' in line:
-                name = line.split(':')[0]
-                wwan_entry = {
-                    'name': name,
-                    'active': name == active_wwan
-                }
-
-                # Add modem info if connection is active
-                if wwan_entry['active'] and modem_info:
-                    wwan_entry['signal'] = modem_info['signal']
-                    wwan_entry['operator'] = modem_info['operator']
-                    wwan_entry['tech'] = modem_info['tech']
-                else:
-                    wwan_entry['signal'] = '-'
-                    wwan_entry['operator'] = '-'
-                    wwan_entry['tech'] = '-'
+        for c in get_connection_list():
+            if c.type != 'gsm':
+                continue
+            wwan_entry = {
+                'name': c.name,
+                'uuid': c.uuid,
+                'active': c.active
+            }
 
-                wwans.append(wwan_entry)
+            # Add modem info if connection is active
+            if wwan_entry['active'] and modem_info:
+                wwan_entry['signal'] = modem_info.signal
+                wwan_entry['operator'] = modem_info.operator
+                wwan_entry['tech'] = modem_info.tech
+            else:
+                wwan_entry['signal'] = '-'
+                wwan_entry['operator'] = '-'
+                wwan_entry['tech'] = '-'
+
+            wwans.append(wwan_entry)
 
         return sorted(wwans, key=lambda x: (not x['active'], x['name']))
     except:
@@ -452,31 +2648,26 @@ def get_wwan_list():
 
 def get_active_wwan():
     """Get currently active WWAN connection name"""
-    try:
-        result = subprocess.run(['nmcli', '-t', '-f', 'NAME,TYPE', 'connection', 'show', '--active'],
-                               capture_output=True, text=True, check=True)
+    backend = get_backend()
+    if backend:
+        try:
+            return backend.get_active_of_types(('gsm',))
+        except Exception:
+            pass
 
-        for line in result.stdout.strip().split('\n'):
-            if ':gsm' in line:
-                return line.split(':')[0]
+    try:
+        for c in nmcli_records(['NAME', 'TYPE'], 'connection', 'show', '--active'):
+            if c['type'] == 'gsm':
+                return c['name']
         return None
     except:
         return None
 
-def connect_wwan(name):
-    """Connect to WWAN by name"""
-    try:
-        result = subprocess.run(['nmcli', 'connection', 'up', name],
-                               capture_output=True, text=True)
-        return result.returncode == 0, result.stderr or result.stdout
-    except Exception as e:
-        return False, str(e)
+@timed_connect('wwan')
+def connect_wwan(key):
+    """Connect to WWAN by profile UUID (or name)"""
+    return connection_up(key)
 
-def disconnect_wwan(name):
-    """Disconnect WWAN by name"""
-    try:
-        result = subprocess.run(['nmcli', 'connection', 'down', name],
-                               capture_output=True, text=True)
-        return result.returncode == 0
-    except:
-        return False
+def disconnect_wwan(key):
+    """Disconnect WWAN by profile UUID (or name)"""
+    return connection_down(key)
@@ -0,0 +1,234 @@
+"""Gazelle profile files - many saved connections in one TOML document
+
+`gazelle import FILE` saves every [[profile]] in one pass over one bus
+connection without activating any of them; `gazelle export` prints the
+saved profiles in the same format. For example:
+
+    [[profile]]
+    name = "eduroam"              # connection id, and the SSID unless ssid is set
+    type = "wifi"                 # wifi, wired or vpn
+    security = "802.1x"           # wifi: open, psk or 802.1x; wired: none or 802.1x
+    username = "alice@example.edu"
+    password = "secret"
+    eap = "peap"                  # peap, ttls or tls
+    phase2 = "mschapv2"
+
+    [[profile]]
+    name = "Corp VPN"
+    type = "vpn"
+    service = "org.freedesktop.NetworkManager.openvpn"
+    [profile.data]
+    remote = "vpn.example.com"
+
+Every profile may also set uuid, interface and autoconnect, and a
+[profile.settings] table of NetworkManager settings ([profile.settings.ipv4]
+and so on) that is merged over the generated ones. Export fills it in with
+the EXPORTED_SETTINGS that differ from NetworkManager's defaults.
+"""
+import json
+import re
+import sys
+from network import WIFI_CONNECTION_TYPES, decode_ssid, eap_settings
+try:
+    import tomllib  # Python 3.11+
+except ImportError:
+    try:
+        import tomli as tomllib  # Fallback for older Python
+    except ImportError:
+        tomllib = None
+
+PROFILE_TYPES = {'wifi': '802-11-wireless', 'wired': '802-3-ethernet', 'vpn': 'vpn'}
+SECURITY_CHOICES = {'wifi': ('open', 'psk', '802.1x'), 'wired': ('none', '802.1x')}
+EAP_METHODS = ('peap', 'ttls', 'tls')
+
+# What export writes to [profile.settings.*] beyond the keys above: the
+# server checks, certificates, static addressing and priority a profile
+# needs to work elsewhere, each with the default that is left out
+IP_DEFAULTS = {'method': 'auto', 'addresses': None, 'gateway': None, 'dns': None,
+               'dns-search': None, 'ignore-auto-dns': False, 'never-default': False}
+EXPORTED_SETTINGS = {
+    'connection': {'autoconnect-priority': 0},
+    '802-1x': {**dict.fromkeys(('ca-cert', 'ca-path', 'domain-suffix-match', 'domain-match',
+                                'subject-match', 'altsubject-matches', 'anonymous-identity',
+                                'client-cert', 'private-key', 'phase2-ca-cert', 'phase2-ca-path',
+                                'phase2-domain-suffix-match', 'phase2-client-cert',
+                                'phase2-private-key')),
+               'system-ca-certs': False},
+    'ipv4': IP_DEFAULTS,
+    'ipv6': IP_DEFAULTS,
+}
+
+BARE_KEY = re.compile(r'^[A-Za-z0-9_-]+$')
+
+def load_profiles(path):
+    """Read the [[profile]] tables of a TOML file ('-' reads stdin)"""
+    if tomllib is None:
+        raise ValueError("reading profile files needs Python 3.11+ or the tomli package")
+    if path == '-':
+        data = tomllib.loads(sys.stdin.read())
+    else:
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    profiles = data.get('profile', [])
+    if not isinstance(profiles, list):
+        raise ValueError("expected [[profile]] tables")
+    return profiles
+
+def profile_settings(spec, number=1):
+    """NetworkManager settings for one [[profile]] table
+
+    Raises ValueError naming the profile when a key is missing or invalid.
+    """
+    name, kind = spec.get('name'), spec.get('type')
+    where = f"profile {number}" + (f" ({name})" if name else "")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"{where}: 'name' is required")
+    if kind not in PROFILE_TYPES:
+        raise ValueError(f"{where}: 'type' must be one of {', '.join(PROFILE_TYPES)}")
+
+    con = {'id': name, 'type': PROFILE_TYPES[kind]}
+    for key, prop in (('uuid', 'uuid'), ('interface', 'interface-name'), ('autoconnect', 'autoconnect')):
+        if key in spec:
+            con[prop] = spec[key]
+    settings = {'connection': con}
+
+    security = spec.get('security') or ('802.1x' if spec.get('username') else
+                                        'psk' if kind == 'wifi' and spec.get('password') else
+                                        'open' if kind == 'wifi' else 'none')
+    if kind in SECURITY_CHOICES and security not in SECURITY_CHOICES[kind]:
+        raise ValueError(f"{where}: 'security' must be one of {', '.join(SECURITY_CHOICES[kind])}")
+    if security == '802.1x':
+        if not spec.get('username'):
+            raise ValueError(f"{where}: 802.1x needs a 'username'")
+        if str(spec.get('eap', 'peap')).lower() not in EAP_METHODS:
+            raise ValueError(f"{where}: 'eap' must be one of {', '.join(EAP_METHODS)}")
+        settings['802-1x'] = eap_settings(spec['username'], spec.get('password', ""),
+                                          spec.get('eap', 'peap'), spec.get('phase2', 'mschapv2'))
+
+    if kind == 'wifi':
+        wireless = settings['802-11-wireless'] = {'ssid': spec.get('ssid', name)}
+        if spec.get('hidden'):
+            wireless['hidden'] = True
+        if security == 'psk':
+            settings['802-11-wireless-security'] = {'key-mgmt': 'wpa-psk', 'psk': spec.get('password', "")}
+        elif security == '802.1x':
+            settings['802-11-wireless-security'] = {'key-mgmt': 'wpa-eap'}
+    elif kind == 'wired':
+        settings['802-3-ethernet'] = {}
+    else:
+        if not spec.get('service'):
+            raise ValueError(f"{where}: a vpn needs a 'service' (the NetworkManager plugin)")
+        settings['vpn'] = {'service-type': spec['service'],
+                           'data': {k: str(v) for k, v in spec.get('data', {}).items()}}
+        if spec.get('secrets'):
+            settings['vpn']['secrets'] = {k: str(v) for k, v in spec['secrets'].items()}
+
+    for setting, props in spec.get('settings', {}).items():
+        if not isinstance(props, dict):
+            raise ValueError(f"{where}: [profile.settings.{setting}] must be a table")
+        settings.setdefault(setting, {}).update(props)
+    return settings
+
+def profile_spec(settings):
+    """The [[profile]] table for a saved profile, or None for types import can't create"""
+    con = settings.get('connection', {})
+    con_type = con.get('type')
+    if con_type in WIFI_CONNECTION_TYPES:
+        kind = 'wifi'
+    elif con_type in ('802-3-ethernet', 'ethernet'):
+        kind = 'wired'
+    elif con_type == 'vpn' and 'vpn' in settings:
+        kind = 'vpn'
+    else:
+        return None  # WireGuard, bridges, loopback, ...
+
+    spec = {'name': con.get('id', ''), 'type': kind}
+    if con.get('uuid'):
+        spec['uuid'] = con['uuid']
+    if con.get('interface-name'):
+        spec['interface'] = con['interface-name']
+    if con.get('autoconnect') is False:
+        spec['autoconnect'] = False
+
+    if kind == 'wifi':
+        wireless = settings.get('802-11-wireless', {})
+        ssid = wireless.get('ssid', spec['name'])
+        if not isinstance(ssid, str):
+            ssid = decode_ssid(ssid)
+        if ssid != spec['name']:
+            spec['ssid'] = ssid
+        if wireless.get('hidden'):
+            spec['hidden'] = True
+        security = settings.get('802-11-wireless-security', {})
+        key_mgmt = security.get('key-mgmt')
+        spec['security'] = ('802.1x' if key_mgmt == 'wpa-eap' else
+                            'psk' if key_mgmt in ('wpa-psk', 'sae') else 'open')
+        if spec['security'] == 'psk' and security.get('psk'):
+            spec['password'] = security['psk']
+        if key_mgmt not in (None, 'wpa-psk', 'wpa-eap'):  # WPA3 (sae), OWE, WEP
+            spec['settings'] = {'802-11-wireless-security': {'key-mgmt': key_mgmt}}
+    elif kind == 'wired':
+        spec['security'] = '802.1x' if '802-1x' in settings else 'none'
+
+    eap = settings.get('802-1x')
+    if eap and spec.get('security') == '802.1x':
+        methods = eap.get('eap') or ['peap']
+        spec['eap'] = methods[0]
+        if eap.get('identity'):
+            spec['username'] = eap['identity']
+        if eap.get('phase2-auth'):
+            spec['phase2'] = eap['phase2-auth']
+        password = eap.get('password') or eap.get('private-key-password')
+        if password:
+            spec['password'] = password
+
+    if kind == 'vpn':
+        vpn = settings['vpn']
+        spec['service'] = vpn.get('service-type', '')
+        if vpn.get('data'):
+            spec['data'] = dict(vpn['data'])
+        if vpn.get('secrets'):
+            spec['secrets'] = dict(vpn['secrets'])
+
+    for setting, defaults in EXPORTED_SETTINGS.items():
+        props = settings.get(setting, {})
+        for key, default in defaults.items():
+            value = props.get(key)
+            if value in (None, "", [], default) or str(value) == str(default):
+                continue
+            if isinstance(value, str) and value.startswith("file://"):
+                value = value[len("file://"):]  # nmcli may print certificates as URIs
+            spec.setdefault('settings', {}).setdefault(setting, {})[key] = value
+    return spec
+
+def toml_key(key):
+    return key if BARE_KEY.match(key) else json.dumps(key)
+
+def toml_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(map(toml_value, value)) + "]"
+    # JSON string escapes are valid TOML; DEL is the one control character JSON leaves alone
+    return json.dumps(str(value), ensure_ascii=False).replace("\x7f", "\\u007f")
+
+def dump_profiles(specs):
+    """[[profile]] tables as a TOML document that load_profiles() reads back"""
+    lines = []
+    for spec in specs:
+        lines.append("[[profile]]")
+        tables = [(toml_key(key), value) for key, value in spec.items() if isinstance(value, dict)]
+        lines += [f"{toml_key(key)} = {toml_value(value)}"
+                  for key, value in spec.items() if not isinstance(value, dict)]
+        while tables:
+            path, table = tables.pop(0)
+            lines.append(f"[profile.{path}]")
+            for key, value in table.items():
+                if isinstance(value, dict):
+                    tables.append((f"{path}.{toml_key(key)}", value))
+                else:
+                    lines.append(f"{toml_key(key)} = {toml_value(value)}")
+        lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,343 @@
+"""Gazelle theme loading: Omarchy auto-detection and user theme.toml
+
+Kept free of Textual imports so the launcher can read theme files on a
+background thread while Textual itself is still importing.
+"""
+from functools import lru_cache
+from pathlib import Path
+import threading
+try:
+    import tomllib  # Python 3.11+
+except ImportError:
+    try:
+        import tomli as tomllib  # Fallback for older Python
+    except ImportError:
+        tomllib = None  # Will use fallback colors
+
+CONFIG_DIR = Path.home() / ".config" / "gazelle"
+
+@lru_cache(maxsize=None)
+def read_toml(path: Path) -> dict:
+    """Parse a TOML file once; colors and styles share theme.toml"""
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+def normalize_color_format(color):
+    """Convert 0xRRGGBB to #RRGGBB for CSS/Textual compatibility.
+    
+    Args:
+        color: Color string in any format
+    
+    Returns:
+        Color string in CSS format (#RRGGBB)
+    """
+    if isinstance(color, str) and color.startswith('0x'):
+        return '#' + color[2:]
+    return color
+
+def load_omarchy_colors():
+    """
+    Load colors from Omarchy's active theme.
+    Returns dict with RGB color values, or None if not found.
+    """
+    if tomllib is None:
+        return None
+    
+    theme_file = Path.home() / ".config/omarchy/current/theme/alacritty.toml"
+    
+    if not theme_file.exists():
+        return None
+    
+    try:
+        data = read_toml(theme_file)
+        
+        colors = data.get("colors", {})
+        normal = colors.get("normal", {})
+        bright = colors.get("bright", {})
+        primary = colors.get("primary", {})
+        
+        return {
+            "accent": normalize_color_format(normal.get("yellow") or bright.get("yellow") or "#EBCB8B"),
+            "primary": normalize_color_format(normal.get("red") or bright.get("red") or "#BF616A"),
+            "foreground": normalize_color_format(primary.get("foreground") or "#D8DEE9"),
+            "background": normalize_color_format(primary.get("background") or "#2E3440"),
+        }
+    except Exception:
+        # If parsing fails, return None to use fallback
+        return None
+
+def load_omarchy_styles():
+    """
+    Detect border style preferences from Omarchy's Hyprland config.
+    Checks all Hyprland config sources in cascade order (last value wins):
+      1. ~/.local/share/omarchy/default/hypr/looknfeel.conf (system default)
+      2. ~/.config/omarchy/current/theme/hyprland.conf (theme override)
+      3. ~/.config/hypr/looknfeel.conf (user override)
+    Returns dict with border style overrides, or None if not found.
+    """
+    # Check if this is an Omarchy system
+    omarchy_indicator = Path.home() / ".config/omarchy/current/theme/alacritty.toml"
+    if not omarchy_indicator.exists():
+        return None
+
+    # Hyprland sources in cascade order — last uncommented value wins
+    config_files = [
+        Path.home() / ".local/share/omarchy/default/hypr/looknfeel.conf",
+        Path.home() / ".config/omarchy/current/theme/hyprland.conf",
+        Path.home() / ".config/hypr/looknfeel.conf",
+    ]
+
+    rounding = 0  # Default: no rounding
+    border_size = 2  # Omarchy default
+
+    try:
+        for config_file in config_files:
+            if not config_file.exists():
+                continue
+            with open(config_file, "r") as f:
+                for line in f:
+                    stripped = line.strip()
+                    # Skip comments
+                    if stripped.startswith("#"):
+                        continue
+                    if "=" in stripped:
+                        key, _, val = stripped.partition("=")
+                        key_name = key.strip()
+                        if key_name == "rounding":
+                            rounding = int(val.strip())
+                        elif key_name == "border_size":
+                            border_size = int(val.strip())
+    except Exception:
+        return None
+
+    # Rounding takes priority — use rounded borders
+    if rounding > 0:
+        return {
+            "dialog_border": "round",
+            "section_border": "round",
+        }
+
+    # Map Hyprland border_size to closest Textual border style
+    if border_size == 0:
+        border_style = "blank"
+    elif border_size >= 3:
+        border_style = "heavy"
+    else:
+        border_style = "solid"
+
+    return {
+        "dialog_border": border_style,
+        "section_border": border_style,
+    }
+
+def load_user_colors(config_dir: Path):
+    """
+    Load colors from user defined theme file.
+    Returns dict with RGB color values, or None if not found.
+    Create file if it doesnt exist, dont load after creation.
+    """
+    if tomllib is None or try_create_user_theme_template(config_dir):
+        return None
+    theme_file = config_dir / "theme.toml"
+
+    if not theme_file.exists():
+        return None
+
+    try:
+        data = read_toml(theme_file)
+
+        colors = data.get("colors", {})
+        normal = colors.get("normal", {})
+        bright = colors.get("bright", {})
+        primary = colors.get("primary", {})
+
+        return {
+            "accent": normalize_color_format(normal.get("yellow") or bright.get("yellow") or "#EBCB8B"),
+            "primary": normalize_color_format(normal.get("red") or bright.get("red") or "#BF616A"),
+            "foreground": normalize_color_format(primary.get("foreground") or "#D8DEE9"),
+            "background": normalize_color_format(primary.get("background") or "#2E3440"),
+        }
+    except Exception:
+        # If parsing fails, return None to use fallback
+        return None
+
+# Default style values matching the original hardcoded CSS
+DEFAULT_STYLES = {
+    "dialog_border": "solid",
+    "dialog_width": "60",
+    "dialog_padding": "1 2",
+    "section_border": "solid",
+    "section_margin": "1 2",
+    "section_padding": "0 1",
+    "section_title_padding": "0 1",
+    "info_section_height": "5",
+    "input_height": "3",
+    "button_min_width": "12",
+    "cursor_opacity": "30%",
+    "hover_opacity": "20%",
+    "title_text_style": "bold",
+    "section_title_text_style": "bold",
+}
+
+# Valid Textual border styles for validation
+VALID_BORDER_STYLES = {"none", "ascii", "blank", "dashed", "double", "heavy", "hidden", "hkey", "inner", "outer", "panel", "round", "solid", "tall", "thick", "vkey", "wide"}
+
+def load_user_styles(config_dir: Path, omarchy_styles: dict = None):
+    """
+    Load TUI style overrides from user theme file.
+    Returns dict with style values merged over defaults.
+    Priority: defaults -> omarchy auto-detect -> user theme.toml
+    """
+    styles = dict(DEFAULT_STYLES)
+
+    # Apply Omarchy auto-detected styles over defaults
+    if omarchy_styles:
+        for key, value in omarchy_styles.items():
+            if key in DEFAULT_STYLES:
+                styles[key] = value
+
+    if tomllib is None:
+        return styles
+
+    theme_file = config_dir / "theme.toml"
+    if not theme_file.exists():
+        return styles
+
+    try:
+        data = read_toml(theme_file)
+
+        user_styles = data.get("styles", {})
+        for key, value in user_styles.items():
+            # Normalize key: allow hyphens or underscores
+            norm_key = key.replace("-", "_")
+            if norm_key in DEFAULT_STYLES:
+                str_val = str(value)
+                # Validate border styles
+                if norm_key in ("dialog_border", "section_border"):
+                    if str_val.lower() not in VALID_BORDER_STYLES:
+                        continue
+                    str_val = str_val.lower()
+                styles[norm_key] = str_val
+    except Exception:
+        pass
+
+    return styles
+
+def build_css(styles: dict) -> str:
+    """Build Textual CSS string from style configuration."""
+    return f"""
+    PasswordScreen, HiddenNetworkScreen, Wired8021xScreen {{ align: center middle; }}
+    #dialog {{ width: {styles['dialog_width']}; height: auto; border: {styles['dialog_border']} $accent; background: $background; padding: {styles['dialog_padding']}; }}
+    #title {{ text-style: {styles['title_text_style']}; color: $accent; margin-bottom: 1; }}
+    .section {{ border: {styles['section_border']} $accent; margin: {styles['section_margin']}; padding: {styles['section_padding']}; }}
+    .section-title {{ text-style: {styles['section_title_text_style']}; color: $accent; background: $background; padding: {styles['section_title_padding']}; }}
+    #device-section, #station-section {{ height: {styles['info_section_height']}; }}
+    Static {{ height: auto; }}
+    Input {{ height: {styles['input_height']}; margin-bottom: 1; }}
+    Select {{ height: {styles['input_height']}; margin-bottom: 1; }}
+    Horizontal {{ height: auto; margin-top: 1; }}
+    Button {{ min-width: {styles['button_min_width']}; }}
+
+    /* DataTable selection/cursor colors */
+    DataTable > .datatable--cursor {{
+        background: $accent {styles['cursor_opacity']};
+        color: $foreground;
+    }}
+
+    DataTable > .datatable--hover {{
+        background: $accent {styles['hover_opacity']};
+    }}
+    """
+
+def try_create_user_theme_template(config_dir: Path):
+    """If file doesn't exist, create a template theme.toml file with commented examples"""
+    theme_file = config_dir / "theme.toml"
+    theme_dir = theme_file.parent
+    
+    # Create directory if it doesn't exist
+    theme_dir.mkdir(parents=True, exist_ok=True)
+    
+    if not theme_file.exists():
+        template_content = """# Gazelle Theme Configuration
+# Uncomment and modify these values to customize your theme
+# Colors should be in hex format (#RRGGBB) or 0xRRGGBB
+[colors.primary]
+#foreground = "#D8DEE9"
+#background = "#2E3440"
+[colors.normal]
+#black = "#3B4252"
+#red = "#BF616A"
+#green = "#A3BE8C"
+#yellow = "#EBCB8B"
+#blue = "#5E81AC"
+#magenta = "#B48EAD"
+#cyan = "#88C0D0"
+#white = "#E5E9F0"
+[colors.bright]
+#black = "#4C566A"
+#red = "#D08770"
+#green = "#8FBCBB"
+#yellow = "#EBCB8B"
+#blue = "#81A1C1"
+#magenta = "#B48EAD"
+#cyan = "#8FBCBB"
+#white = "#ECEFF4"
+
+# TUI Style Overrides
+# Uncomment and modify these values to customize borders, spacing, etc.
+# Border styles: ascii, blank, dashed, double, heavy, hidden, hkey, inner,
+#   none, outer, panel, round, solid, tall, thick, vkey, wide
+# Spacing values use Textual CSS units (e.g. "1 2" = 1 vertical, 2 horizontal)
+[styles]
+#dialog_border = "solid"
+#dialog_width = "60"
+#dialog_padding = "1 2"
+#section_border = "solid"
+#section_margin = "1 2"
+#section_padding = "0 1"
+#section_title_padding = "0 1"
+#info_section_height = "5"
+#input_height = "3"
+#button_min_width = "12"
+#cursor_opacity = "30%"
+#hover_opacity = "20%"
+#title_text_style = "bold"
+#section_title_text_style = "bold"
+"""
+        with open(theme_file, "w") as f:
+            f.write(template_content)
+        return True
+    return False
+
+def load_theme(config_dir: Path = CONFIG_DIR) -> dict:
+    """
+    Read every theme source once.
+    Returns dict with the app CSS and the Omarchy and user color sets
+    (either may be None).
+    """
+    user_colors = load_user_colors(config_dir)
+    # Load styles: defaults -> omarchy auto-detect -> user overrides
+    styles = load_user_styles(config_dir, load_omarchy_styles())
+    return {
+        "css": build_css(styles),
+        "omarchy_colors": load_omarchy_colors(),
+        "user_colors": user_colors,
+    }
+
+class ThemeLoader:
+    """Run load_theme() on a background thread; result() waits for it"""
+
+    def __init__(self, config_dir: Path = CONFIG_DIR):
+        self.config_dir = config_dir
+        self._theme = None
+        self._thread = threading.Thread(target=self._load, name="theme-loader", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        self._theme = load_theme(self.config_dir)
+
+    def result(self) -> dict:
+        self._thread.join()
+        if self._theme is None:  # Loader thread failed; load here instead
+            self._theme = load_theme(self.config_dir)
+        return self._theme